@@ -0,0 +1,119 @@
+import argparse
+import random
+from datetime import datetime
+from decimal import Decimal
+from time import perf_counter
+
+import psycopg
+from psycopg.adapt import AdaptersMap, Dumper, PyFormat, RecursiveDumper, Transformer
+from psycopg.pq import Format
+
+from akiradb.types.dumpers import forbidden_chars, register_dumpers
+from akiradb.types.query import Label
+
+
+# Dumpers as they were before the caches, the float formatter and the string quoting
+class LegacyStringDumper(Dumper):
+    format = Format.TEXT
+
+    def dump(self, obj: str) -> bytes:
+        return obj.encode('utf-8')
+
+
+class LegacyLabelDumper(Dumper):
+    format = Format.TEXT
+
+    def dump(self, obj: Label) -> bytes:
+        return obj.label_name.encode('utf-8')
+
+    def quote(self, obj: Label) -> bytes:
+        return forbidden_chars.sub('_', obj.label_name).encode('utf-8')
+
+
+class LegacyFloatDumper(Dumper):
+    format = Format.TEXT
+
+    def dump(self, obj: float) -> bytes:
+        return format(Decimal(obj), 'f').encode('utf-8')
+
+    def quote(self, obj: float) -> bytes:
+        return self.dump(obj)
+
+
+class LegacyDictDumper(RecursiveDumper):
+    format = Format.TEXT
+
+    def dump(self, _: dict) -> bytes:
+        raise NotImplementedError()
+
+    def quote(self, obj: dict) -> bytes:
+        from akiradb.model.proxies import PropertyChangesRecorder
+
+        format = PyFormat.from_pq(self.format)
+        get_value = lambda val: val.value if isinstance(val, PropertyChangesRecorder) else val
+
+        res = (forbidden_chars.sub('_', key).encode('utf-8') + b':'
+               + self._tx.get_dumper((val := get_value(value)), format).quote(val)
+               for key, value in obj.items())
+
+        return b'{' + b','.join(res) + b'}'
+
+
+class LegacyListDumper(RecursiveDumper):
+    format = Format.TEXT
+
+    def dump(self, _: list) -> bytes:
+        raise NotImplementedError()
+
+    def quote(self, obj: list) -> bytes:
+        format = PyFormat.from_pq(self.format)
+
+        res = (self._tx.get_dumper(value, format).quote(value) for value in obj)
+
+        return b'[' + b','.join(res) + b']'
+
+
+def make_rows(count: int, width: int) -> list:
+    now = datetime.now()
+    values = [lambda: random.random() * 1000, lambda: random.randrange(10**6),
+              lambda: f'value {random.random()}', lambda: f"it's \\ {random.random()}",
+              lambda: random.random() < 0.5,
+              lambda: [random.random(), random.randrange(100)], lambda: now]
+    return [{f'property_{i}': values[i % len(values)]() for i in range(width)}
+            for _ in range(count)]
+
+
+def transformer(legacy: bool):
+    adapters = AdaptersMap(psycopg.adapters)
+    register_dumpers(adapters)
+    if legacy:
+        adapters.register_dumper(str, LegacyStringDumper)
+        adapters.register_dumper(Label, LegacyLabelDumper)
+        adapters.register_dumper(float, LegacyFloatDumper)
+        adapters.register_dumper(dict, LegacyDictDumper)
+        adapters.register_dumper(list, LegacyListDumper)
+    return Transformer(adapters)
+
+
+def bench(legacy: bool, rows: list) -> tuple[float, bytes]:
+    # Bulk statements send their rows as a single list parameter
+    start = perf_counter()
+    quoted = transformer(legacy).get_dumper(rows, PyFormat.TEXT).quote(rows)
+    return perf_counter() - start, bytes(quoted)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Property maps serialisation speed')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--width', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.width)
+    results = {}
+    for name, legacy in (('legacy', True), ('current', False)):
+        elapsed, quoted = min(bench(legacy, rows) for _ in range(args.repeat))
+        results[name] = quoted
+        print(f'{name:>8}: {len(quoted) / elapsed / 2**20:>8,.1f} MiB/s, '
+              f'{args.rows / elapsed:>10,.0f} rows/s')
+    assert results['legacy'] == results['current'], 'serialisations differ'
@@ -0,0 +1,76 @@
+import argparse
+from dataclasses import fields
+from datetime import datetime
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+from akiradb.model.base_model import BaseModel, RowDecoder
+from akiradb.model.relations import Many, relation
+
+
+class Player(BaseModel):
+    name: str
+    level: int
+    score: float
+    guild: Optional[str]
+    title: Optional[str]
+    alive: bool
+    created_at: datetime
+    inventory: list[str]
+    friends = relation('friends_with', Many['Player'])
+
+
+COLUMNS = ('@rid', '@type', '@cat', 'name', 'level', 'score', 'guild', 'title', 'alive',
+           'created_at', 'inventory')
+
+
+def make_rows(count: int) -> list[tuple]:
+    now = datetime.now()
+    return [(f'#1:{i}', 'Player', 'v', f'player{i}', i % 100, i / 3, None if i % 2 else 'guild',
+             None, True, now, ['sword', 'shield']) for i in range(count)]
+
+
+# Hydration as done before the row decoders: dict rows, filtered and passed to __init__
+def legacy_hydrate(row: dict[str, Any]) -> BaseModel:
+    model_cls = BaseModel._models[row['@type']]
+    properties = {name: value for (name, value) in row.items()
+                  if not name.startswith('@') and value is not None}
+    for model_field in fields(model_cls):
+        if model_field.name in model_cls._properties_names and model_field.name not in properties:
+            properties[model_field.name] = None
+    instance = model_cls(**properties)
+    instance._rid = row['@rid']
+    return instance
+
+
+def bench_legacy(rows: list[tuple]) -> float:
+    start = perf_counter()
+    for row in rows:
+        legacy_hydrate(dict(zip(COLUMNS, row)))
+    return perf_counter() - start
+
+
+def bench_decoder(rows: list[tuple]) -> float:
+    cursor = SimpleNamespace(description=[SimpleNamespace(name=name) for name in COLUMNS])
+    start = perf_counter()
+    decoder = RowDecoder.get(RowDecoder.columns(cursor))  # type: ignore[arg-type]
+    for row in rows:
+        decoder.decode(row)
+    return perf_counter() - start
+
+
+def run(name: str, bench: Callable[[list[tuple]], float], rows: list[tuple], repeat: int):
+    elapsed = min(bench(rows) for _ in range(repeat))
+    print(f'{name:>8}: {len(rows) / elapsed:>12,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rows hydrated per second, without a database')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    run('dict_row', bench_legacy, rows, args.repeat)
+    run('decoder', bench_decoder, rows, args.repeat)
@@ -0,0 +1,51 @@
+import argparse
+import gc
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable
+
+from hydration import COLUMNS, Player, make_rows
+
+from akiradb.model.base_model import BaseModel, RowDecoder
+
+
+def measure(name: str, count: int, step: Callable[[], object]) -> object:
+    gc.collect()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = step()
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    print(f'{name:>16}: {allocated / 2**20:>10,.1f} MiB, {allocated / count:>8,.1f} bytes/node')
+    return result
+
+
+def fetch(rows: list[tuple]) -> list[BaseModel]:
+    cursor = SimpleNamespace(description=[SimpleNamespace(name=name) for name in COLUMNS])
+    decoder = RowDecoder.get(RowDecoder.columns(cursor))  # type: ignore[arg-type]
+    return [decoder.decode(row) for row in rows]
+
+
+def read(nodes: list[Player]):
+    for node in nodes:
+        node.name, node.level, node.score
+        node.friends
+
+
+def mutate(nodes: list[Player]):
+    for node in nodes:
+        node.level += 1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Memory held by fetched nodes, '
+                                                 'without a database')
+    parser.add_argument('--nodes', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    rows = measure('rows', args.nodes, lambda: make_rows(args.nodes))
+    nodes = measure('fetched nodes', args.nodes, lambda: fetch(rows))  # type: ignore[arg-type]
+    measure('after reads', args.nodes, lambda: read(nodes))  # type: ignore[arg-type]
+    measure('after mutations', args.nodes, lambda: mutate(nodes))  # type: ignore[arg-type]
+    tracemalloc.stop()
@@ -57,6 +57,7 @@ class Media(Model):
 
 async def main():
     await Model._database_connection.connect()
+    await Model.sync_schema()
 
     nana_chans = []
     senpai_kuns = []
@@ -88,10 +89,11 @@ async def main():
 
     nana_chans_2 = await Person.fetch_many(Person.name == 'Nana-chan')
     print(len(nana_chans_2))
-    print(len(await Person.fetch_all()))
+    print(await Person.count())
 
     married_nana_chans = await Person.fetch_many((Person.name == 'Nana-chan')
-                                                 & (Person.married == True))
+                                                 & (Person.married == True),
+                                                 prefetch=[Person.spouses])
     for married_nana_chan in married_nana_chans:
         married_nana_chan.married = False
         if married_nana_chan.name:
@@ -120,7 +122,7 @@ async def main():
         married_nana_chan.name = 'Nana'
         married_nana_chan.married = False
 
-    await BaseModel.bulk_save(married_nana_chans)
+    await BaseModel.bulk_save(married_nana_chans, pipeline=True)
 
     await Media.bulk_delete(await Media.fetch_all())
     medias = [Media(id=1), Media(id=2)]
@@ -131,7 +133,8 @@ async def main():
     medias[1].name = 'Serial Experiments Lain'
     medias.append(Media(id=3, name='Neon Genesis Evangelion'))
 
-    await Media.bulk_upsert([(m, {'id': m.id}) for m in medias])
+    upsert_result = await Media.bulk_upsert([(m, {'id': m.id}) for m in medias])
+    print(f'created: {upsert_result.created}, matched: {upsert_result.matched}')
     print([f'(rid: {m._rid}, {m})' for m in medias])
 
     nonePerson = Person(name=None)
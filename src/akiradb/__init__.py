@@ -1,2 +1,3 @@
-from .database_connection import DatabaseConnection as DatabaseConnection
+from .database_connection import (DatabaseConnection as DatabaseConnection,
+                                  PooledDatabaseConnection as PooledDatabaseConnection)
 from .model import BaseModel as BaseModel, relations as relations
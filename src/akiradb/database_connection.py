@@ -1,11 +1,20 @@
+import asyncio
 from asyncio import Lock
 import contextlib
-from typing import AsyncGenerator, Optional, cast
+from contextvars import ContextVar
+from functools import lru_cache
+import logging
+import re
+from typing import Any, AsyncGenerator, Optional, TypeVar, cast
 
 import psycopg
+from psycopg.adapt import PyFormat
+from psycopg_pool import AsyncConnectionPool
 from akiradb.exceptions import AkiraNotConnectedException
 from akiradb.types import loaders, dumpers
-from akiradb.types.query import Params, Query
+from akiradb.types.query import Label, Params, Query
+
+logger = logging.getLogger(__name__)
 
 
 class AkiraAsyncClientCursor(psycopg.AsyncClientCursor):
@@ -18,25 +27,101 @@ class AkiraAsyncClientCursor(psycopg.AsyncClientCursor):
         return await self.execute(f'{{cypher}} {query};', params)
 
 
+_placeholder = re.compile(r'%\((\w+)\)s')
+
+
+@lru_cache(maxsize=1024)
+def _inline_labels(query: str, labels: tuple[tuple[str, str], ...]) -> str:
+    inlined = dict(labels)
+    return _placeholder.sub(lambda match: inlined.get(match[1], match[0]), query)
+
+
+_Self = TypeVar('_Self', bound='AkiraAsyncCursor')
+
+
+class AkiraAsyncCursor(psycopg.AsyncCursor):
+    # Values are bound server-side, only labels (and maps or lists, which can't be sent as
+    # parameters) are inlined, so repeated queries keep the same text and can be prepared.
+    # SQL statements are schema statements, which can't take parameters: they are fully inlined
+    def _bind(self, query: str, params: Optional[Params],
+              inline: bool = False) -> tuple[Query, Optional[Params]]:
+        if not params:
+            return cast(Query, query), params
+
+        labels: list[tuple[str, str]] = []
+        literals: dict[str, str] = {}
+        bound: dict[str, Any] = {}
+        for name, value in params.items():
+            if isinstance(value, Label):
+                labels.append((name, dumpers._sanitise(value.label_name).decode('utf-8')))
+            elif inline:
+                literals[name] = self._tx.as_literal(value).decode('utf-8').replace('%', '%%')
+            elif isinstance(value, (dict, list)):
+                quoted = bytes(self._tx.get_dumper(value, PyFormat.TEXT).quote(value))
+                literals[name] = quoted.decode('utf-8').replace('%', '%%')
+            else:
+                bound[name] = value
+
+        query = _inline_labels(query, tuple(labels))
+        if literals:
+            query = _placeholder.sub(lambda match: literals.get(match[1], match[0]), query)
+        return cast(Query, query), bound
+
+    async def execute_sql(self: _Self, query: Query, params: Optional[Params] = None) -> _Self:
+        return await self.execute(*self._bind(f'{query};', params, inline=True))
+
+    async def execute_cypher(self: _Self, query: Query,
+                             params: Optional[Params] = None) -> _Self:
+        return await self.execute(*self._bind(f'{{cypher}} {query};', params))
+
+    @staticmethod
+    def statement_cache_info():
+        return _inline_labels.cache_info()
+
+
 class DatabaseConnection():
     def __init__(self, hostname='localhost', port=5432, database='test_db',
-                 username='user', password='password'):
+                 username='user', password='password', server_side_binding: bool = False,
+                 prepare_threshold: int | None = 5):
         self.hostname = hostname
         self.port = port
         self.database = database
         self.user = username
         self.password = password
+        self.server_side_binding = server_side_binding
+        self.prepare_threshold = prepare_threshold
 
         self._conn = None
         self._conn_transaction_lock = Lock()
 
+    @property
+    def _conninfo(self) -> str:
+        return (f"dbname={self.database} user={self.user} password={self.password} "
+                f"host={self.hostname} port={self.port}")
+
+    @property
+    def _cursor_factory(self) -> type[psycopg.AsyncCursor]:
+        return AkiraAsyncCursor if self.server_side_binding else AkiraAsyncClientCursor
+
+    async def _configure(self, conn: psycopg.AsyncConnection):
+        # Statements seen prepare_threshold times are prepared, only once their text is stable
+        conn.prepare_threshold = self.prepare_threshold if self.server_side_binding else None
+        loaders.register_loaders(conn.adapters)
+        dumpers.register_dumpers(conn.adapters)
+
     async def connect(self):
         self._conn = await psycopg.AsyncConnection.connect(
-            f"dbname={self.database} user={self.user} password={self.password} "
-            f"host={self.hostname}", autocommit=True, cursor_factory=AkiraAsyncClientCursor)
-        self._conn.prepare_threshold = None
-        loaders.register_loaders(self._conn.adapters)
-        dumpers.register_dumpers(self._conn.adapters)
+            self._conninfo, autocommit=True, cursor_factory=self._cursor_factory)
+        await self._configure(self._conn)
+
+    @contextlib.asynccontextmanager
+    async def _connection(self) -> AsyncGenerator[psycopg.AsyncConnection, None]:
+        if not self._conn:
+            raise AkiraNotConnectedException()
+
+        # Only a single transaction per connection
+        async with self._conn_transaction_lock:
+            yield self._conn
 
     @contextlib.asynccontextmanager
     async def execute(self, command):
@@ -57,13 +142,9 @@ class DatabaseConnection():
 
     @contextlib.asynccontextmanager
     async def cursor(self, **kwargs) -> AsyncGenerator[AkiraAsyncClientCursor, None]:
-        if not self._conn:
-            raise AkiraNotConnectedException()
-
-        # Only a single transaction per connection
-        async with self._conn_transaction_lock:
-            async with self._conn.transaction():
-                async with self._conn.cursor(**kwargs) as cur:
+        async with self._connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor(**kwargs) as cur:
                     yield cast(AkiraAsyncClientCursor, cur)
 
     async def commit(self):
@@ -79,3 +160,99 @@ class DatabaseConnection():
 
         await self._conn.close()
         self._conn = None
+
+
+# Connection pinned by pipeline() for the cursors opened in the same context, per pool
+_pinned_connections: ContextVar[
+    dict['PooledDatabaseConnection', tuple[psycopg.AsyncConnection, Lock]]
+] = ContextVar('akiradb_pinned_connections', default={})
+
+
+class PooledDatabaseConnection(DatabaseConnection):
+    def __init__(self, *args, min_size: int = 4, max_size: int | None = None,
+                 timeout: float = 30.0, check_interval: float | None = 60.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_interval = check_interval
+
+        self._pool: AsyncConnectionPool | None = None
+        self._check_task: asyncio.Task | None = None
+
+    async def connect(self):
+        self._pool = AsyncConnectionPool(
+            self._conninfo, open=False, configure=self._configure,
+            kwargs={'autocommit': True, 'cursor_factory': self._cursor_factory},
+            min_size=self.min_size, max_size=self.max_size, timeout=self.timeout
+        )
+        await self._pool.open(wait=True, timeout=self.timeout)
+        if self.check_interval is not None:
+            self._check_task = asyncio.create_task(self._check_periodically(self.check_interval))
+
+    async def _check_periodically(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            # A failed check must not stop the next ones
+            try:
+                await self.check()
+            except Exception:
+                logger.exception('Pooled connections check failed')
+
+    async def check(self):
+        if not self._pool:
+            raise AkiraNotConnectedException()
+
+        # Drops the broken idle connections and replaces them
+        await self._pool.check()
+
+    @contextlib.asynccontextmanager
+    async def _connection(self) -> AsyncGenerator[psycopg.AsyncConnection, None]:
+        if not self._pool:
+            raise AkiraNotConnectedException()
+
+        pinned = _pinned_connections.get().get(self)
+        if pinned:
+            conn, lock = pinned
+            async with lock:
+                yield conn
+        else:
+            async with self._pool.connection() as conn:
+                yield conn
+
+    @contextlib.asynccontextmanager
+    async def execute(self, command):
+        async with self._connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(command)
+                yield cur
+
+    @contextlib.asynccontextmanager
+    async def pipeline(self):
+        async with self._connection() as conn:
+            async with conn.pipeline() as pipeline:
+                token = _pinned_connections.set({**_pinned_connections.get(),
+                                                 self: (conn, Lock())})
+                try:
+                    yield pipeline
+                finally:
+                    _pinned_connections.reset(token)
+
+    # Each cursor() runs in its own transaction, already committed when its context exits:
+    # there is nothing left to commit, and no caller's transaction on an arbitrary pooled
+    # connection to send 'commit;' to
+    async def commit(self):
+        if not self._pool:
+            raise AkiraNotConnectedException()
+
+    async def close(self):
+        if not self._pool:
+            raise AkiraNotConnectedException()
+
+        if self._check_task:
+            self._check_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._check_task
+            self._check_task = None
+        await self._pool.close()
+        self._pool = None
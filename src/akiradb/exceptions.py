@@ -16,3 +16,24 @@ class AkiraUnknownNodeException(Exception):
 class AkiraNodeNotFoundException(Exception):
     def __init__(self):
         super().__init__('Requested node could not be found')
+
+
+class AkiraPipelinedOperationException(Exception):
+    def __init__(self, nodes: list):
+        super().__init__(f'Pipelined operation failed on {len(nodes)} node(s)')
+        self.nodes = nodes
+
+
+class AkiraUnknownAggregateException(Exception):
+    def __init__(self, function: str):
+        super().__init__(f'Unknown aggregate function {function}')
+
+
+class AkiraInvalidTraversalException(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f'Invalid traversal: {reason}')
+
+
+class AkiraMissingUniqueIndexException(Exception):
+    def __init__(self, node_type: str, keys: list[str]):
+        super().__init__(f'Node Type {node_type} has no unique index on {", ".join(keys)}')
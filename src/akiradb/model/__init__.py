@@ -1,2 +1,4 @@
 from .base_model import BaseModel
 from .relations import relation
+from .indexes import Index, indexed
+from .identity_map import IdentityMap, identity_map
@@ -1,20 +1,35 @@
 import asyncio
+import base64
+import contextlib
+import hashlib
+import json
+from copy import copy
 from dataclasses import MISSING, Field, dataclass, fields
-from typing import TYPE_CHECKING, Any, ClassVar, ParamSpec, Type, TypeVar, cast
+from datetime import datetime
+from typing import (TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, ClassVar, Generic,
+                    Iterable, Iterator, NamedTuple, ParamSpec, Sequence, Type, TypeVar, cast)
 
-from psycopg.rows import dict_row
+import psycopg
 
 from akiradb.database_connection import AkiraAsyncClientCursor, DatabaseConnection
-from akiradb.exceptions import (AkiraNodeNotFoundException,
-                                AkiraNodeTypeAlreadyDefinedException, AkiraUnknownNodeException)
-from akiradb.model.conditions import Condition, PropertyCondition
-from akiradb.model.proxies import PropertyChangesRecorder, PropertyChangesRecorderDescriptor
-from akiradb.model.utils import (__dataclass_transform__, _get_cypher_property_type,
-                                 _parse_cypher_properties)
+from akiradb.exceptions import (AkiraInvalidTraversalException,
+                                AkiraMissingUniqueIndexException, AkiraNodeNotFoundException,
+                                AkiraNodeTypeAlreadyDefinedException,
+                                AkiraPipelinedOperationException,
+                                AkiraUnknownAggregateException, AkiraUnknownNodeException)
+from akiradb.model.conditions import (Condition, GreaterThan, Ordering, PropertyCondition,
+                                      RidCondition)
+from akiradb.model.identity_map import _forget, _lookup, _register
+from akiradb.model.indexes import Index
+from akiradb.model.proxies import (Change, PropertyChangesRecorderDescriptor,
+                                   _coalesce_changes)
+from akiradb.model.read_cache import ReadCache, ReadCacheStats
+from akiradb.model.utils import (__dataclass_transform__, _chunks, _get_cypher_property_type,
+                                 _group_by_class)
 from akiradb.types.query import Label, Params, Query
 
 if TYPE_CHECKING:
-    from akiradb.model.relations import Relation
+    from akiradb.model.relations import Properties, Relation
 
 
 @__dataclass_transform__()
@@ -22,7 +37,9 @@ class MetaModel(type):
     _models: dict[str, 'MetaModel'] = {}
 
     def __new__(cls, name, bases, dct,
-                database_connection: DatabaseConnection | None = None):
+                database_connection: DatabaseConnection | None = None,
+                read_cache_size: int | None = None, read_cache_ttl: float | None = None,
+                indexes: Sequence[Index] = (), require_unique_upserts: bool | None = None):
         if '__annotations__' not in dct:
             dct['__annotations__'] = {}
 
@@ -35,7 +52,7 @@ class MetaModel(type):
                 if 'type' in field.metadata:
                     setattr(instance, field.name, field)
 
-        properties_names = []
+        properties_names: list[str] = []
         relations_names = []
         for key, value in rec_dct.items():
             if isinstance(value, Field) and 'type' in value.metadata:
@@ -45,22 +62,44 @@ class MetaModel(type):
         if database_connection is not None:
             instance._database_connection = database_connection
 
+        if read_cache_size is not None or read_cache_ttl is not None:
+            instance._read_cache_config = (1024 if read_cache_size is None else read_cache_size,
+                                           read_cache_ttl)
+
+        if require_unique_upserts is not None:
+            instance._require_unique_upserts = require_unique_upserts
+
         dataclass_instance = cast(Type['BaseModel'], dataclass(instance))
+        model_indexes = []
         for field in fields(dataclass_instance):
-            if field.name not in relations_names:
-                properties_names.append(field.name)
+            # Indexes of inherited properties belong to the supertypes
+            if 'index' in field.metadata and field.name in dct['__annotations__']:
+                index = field.metadata['index']
+                model_indexes.append(Index(field.name, unique=index.unique,
+                                           full_text=index.full_text))
+            if field.name in relations_names:
+                setattr(dataclass_instance, field.name, RelationDescriptor(
+                    field.name, cast(Callable[[], 'Relation'], field.default_factory)
+                ))
+            else:
                 setattr(dataclass_instance, field.name,
-                        PropertyChangesRecorderDescriptor(field.name))
+                        PropertyChangesRecorderDescriptor(field.name, len(properties_names)))
+                properties_names.append(field.name)
         dataclass_instance._properties_names = properties_names
+        dataclass_instance._properties_set = frozenset(properties_names)
         dataclass_instance._relations_names = relations_names
+        dataclass_instance._indexes = (*model_indexes, *indexes)
+        # Every model gets its own cache so that it only holds rows of its own type, a size of
+        # 0 disables it
+        read_cache_config = getattr(dataclass_instance, '_read_cache_config', None)
+        dataclass_instance._read_cache = (ReadCache(*read_cache_config)
+                                          if read_cache_config and read_cache_config[0] > 0
+                                          else None)
 
         if name in MetaModel._models:
             raise AkiraNodeTypeAlreadyDefinedException(name)
         MetaModel._models[name] = dataclass_instance
 
-        if hasattr(dataclass_instance, '_database_connection'):
-            asyncio.run(dataclass_instance._create_type_and_properties())
-
         return dataclass_instance
 
     def __getattribute__(self, name: str) -> Any:
@@ -70,110 +109,620 @@ class MetaModel(type):
                 return PropertyCondition(name)
         except AttributeError:
             pass
+        # Relations are only referenced once the model is built, dataclass() needs their fields
+        relations_names = super().__getattribute__('__dict__').get('_relations_names', ())
+        if name in relations_names:
+            return RelationReference(cast(Type['BaseModel'], self), name)
         return super().__getattribute__(name)
 
 
+class RelationReference():
+    def __init__(self, model_cls: Type['BaseModel'], name: str):
+        self.model_cls = model_cls
+        self.name = name
+
+    async def prefetch(self, nodes: Sequence['BaseModel'], chunk_size: int = 1000):
+        if nodes:
+            relation: 'Relation' = getattr(nodes[0], self.name)
+            await relation._prefetch(self.model_cls, nodes, chunk_size=chunk_size)
+
+    def _get_relation(self) -> 'Relation':
+        for model_cls in self.model_cls.__mro__:
+            descriptor = model_cls.__dict__.get(self.name)
+            if isinstance(descriptor, RelationDescriptor):
+                relation = descriptor.factory()
+                relation._attribute_name = self.name
+                return relation
+        raise AttributeError(self.name)
+
+    async def bulk_link(self, pairs: Iterable[tuple['BaseModel', 'BaseModel']
+                                              | tuple['BaseModel', 'BaseModel', 'Properties']],
+                        chunk_size: int = 1000, pipeline: bool = False):
+        await self._get_relation().bulk_link(pairs, chunk_size=chunk_size, pipeline=pipeline)
+
+
+# Multi-hop walk along relations, compiled to a single match path
+class Traversal():
+    def __init__(self, model_cls: Type['BaseModel'],
+                 start: Condition | Sequence['BaseModel'] | None = None):
+        self.model_cls = model_cls
+        self._types: list[Type['BaseModel']] = [model_cls]
+        self._relations_names: list[str] = []
+        self._conditions: list[Condition | None] = [None]
+        self._start_rids: list[str] | None = None
+        if isinstance(start, Condition):
+            if start._uses_edge():
+                raise AkiraInvalidTraversalException('the start nodes have no edge to filter on')
+            self._conditions[0] = start
+        elif start is not None:
+            self._start_rids = [node._rid for node in start]
+
+    def _copy(self) -> 'Traversal':
+        traversal = copy(self)
+        traversal._types = self._types.copy()
+        traversal._relations_names = self._relations_names.copy()
+        traversal._conditions = self._conditions.copy()
+        return traversal
+
+    def then(self, relation: RelationReference) -> 'Traversal':
+        # Only relations of the current hop's type can be followed
+        if not issubclass(self._types[-1], relation.model_cls):
+            raise AkiraInvalidTraversalException(
+                f'{self._types[-1].__qualname__} has no relation {relation.name}'
+            )
+        traversal = self._copy()
+        relation_instance = relation._get_relation()
+        traversal._types.append(relation_instance._get_target_cls())
+        traversal._relations_names.append(relation_instance._name)
+        traversal._conditions.append(None)
+        return traversal
+
+    # Conditions apply to the last hop's node as n and to the edge leading to it as r
+    def where(self, condition: Condition) -> 'Traversal':
+        if not self._relations_names and condition._uses_edge():
+            raise AkiraInvalidTraversalException('the start nodes have no edge to filter on')
+        traversal = self._copy()
+        previous = traversal._conditions[-1]
+        traversal._conditions[-1] = condition if previous is None else previous & condition
+        return traversal
+
+    def _get_request(self, variables: Sequence[int],
+                     limit: int | None = None) -> tuple[Query, Params]:
+        params: dict[str, Any] = {'type0': Label(self._types[0].__qualname__)}
+        req = 'match (n0:%(type0)s)'
+        for i, relation_name in enumerate(self._relations_names, start=1):
+            req += f' -[r{i}:%(relation{i})s]-> (n{i}:%(type{i})s)'
+            params[f'relation{i}'] = Label(relation_name)
+            params[f'type{i}'] = Label(self._types[i].__qualname__)
+
+        where_queries: list[str] = []
+        if self._start_rids is not None:
+            where_queries.append('id(n0) in %(start_rids)s')
+            params['start_rids'] = self._start_rids
+        value_id = 0
+        for i, condition in enumerate(self._conditions):
+            if condition is not None:
+                rc, pc = condition._query(value_id, f'n{i}', f'r{i}')
+                where_queries.append('(' + rc + ')')
+                params.update(pc)
+                value_id += len(pc)
+        if where_queries:
+            req += ' where ' + ' and '.join(where_queries)
+
+        columns_query = []
+        for i in variables:
+            columns_query.append(f'id(n{i}),labels(n{i})')
+            for j, property_name in enumerate(self._types[i]._properties_names):
+                property_id = f'property{i}_{j}'
+                columns_query.append('%(' + property_id + ')s')
+                params[property_id] = Label(f'n{i}.{property_name}')
+        # Several paths can lead to the same endpoints
+        req += ' return distinct ' if len(variables) == 1 else ' return '
+        req += ','.join(columns_query)
+
+        if limit is not None:
+            req += ' limit %(limit)s'
+            params['limit'] = limit
+        return cast(Query, req), params
+
+    async def _fetch_rows(self, variables: Sequence[int], limit: int | None
+                          ) -> tuple[list[tuple], list['RowDecoder']]:
+        async with self.model_cls._database_connection.cursor() as cursor:
+            await cursor.execute_cypher(*self._get_request(variables, limit))
+            rows = await cursor.fetchall()
+            columns = RowDecoder.columns(cursor)
+        return rows, [RowDecoder.get(columns, f'n{i}') for i in variables]
+
+    async def fetch(self, limit: int | None = None) -> list['BaseModel']:
+        rows, (decoder,) = await self._fetch_rows((len(self._types) - 1,), limit)
+        return [decoder.decode(row) for row in rows]
+
+    async def paths(self, limit: int | None = None) -> list[tuple['BaseModel', ...]]:
+        rows, decoders = await self._fetch_rows(range(len(self._types)), limit)
+        return [tuple(decoder.decode(row) for decoder in decoders) for row in rows]
+
+
+# Relations of fetched nodes are only built when first accessed
+class RelationDescriptor():
+    def __init__(self, name: str, factory: Callable[[], 'Relation']):
+        self.name = name
+        self.factory = factory
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        relation = self.factory()
+        relation._source = instance
+        relation._attribute_name = self.name
+        instance.__dict__[self.name] = relation
+        return relation
+
+
+class RowDecoder():
+    _decoders: ClassVar[dict[tuple[tuple[str, ...], str | None], 'RowDecoder']] = {}
+
+    def __init__(self, columns: tuple[str, ...], variable: str | None = None):
+        # Whole nodes are returned with @rid, @type and unprefixed properties
+        if variable is None:
+            id_column, type_column, prefix = '@rid', '@type', ''
+        else:
+            id_column, type_column = f'id({variable})', f'labels({variable})'
+            prefix = variable + '.'
+        self.id_index = columns.index(id_column) if id_column in columns else None
+        self.type_index = columns.index(type_column) if type_column in columns else None
+        self._columns = {name[len(prefix):]: i for i, name in enumerate(columns)
+                         if name.startswith(prefix) and not name.startswith('@')}
+        # Class -> column index of each of its properties
+        self._indices: dict[type, tuple[int | None, ...]] = {}
+        # Type name -> everything needed to build its nodes, resolved once per decoder
+        self._plans: dict[str, _HydrationPlan] = {}
+
+    @classmethod
+    def get(cls, columns: tuple[str, ...], variable: str | None = None) -> 'RowDecoder':
+        decoder = cls._decoders.get((columns, variable))
+        if decoder is None:
+            decoder = cls._decoders[(columns, variable)] = cls(columns, variable)
+        return decoder
+
+    @staticmethod
+    def columns(cursor: AkiraAsyncClientCursor) -> tuple[str, ...]:
+        return tuple(column.name for column in cursor.description or ())
+
+    def _get_indices(self, cls: type, names: Sequence[str]) -> tuple[int | None, ...]:
+        indices = self._indices.get(cls)
+        if indices is None:
+            indices = self._indices[cls] = tuple(self._columns.get(name) for name in names)
+        return indices
+
+    def _get_plan(self, type_name: str) -> '_HydrationPlan':
+        plan = self._plans.get(type_name)
+        if plan is None:
+            model_cls = MetaModel._models[type_name]
+            plan = self._plans[type_name] = _HydrationPlan(
+                cast(Type['BaseModel'], model_cls),
+                self._get_indices(model_cls, model_cls._properties_names),
+                model_cls._properties_set
+            )
+        return plan
+
+    def values(self, row: Sequence[Any], cls: type, names: Sequence[str]) -> list[Any]:
+        # Missing properties of matched nodes come back as the null marker
+        return [None if i is None or (value := row[i]) == '  cypher.null' else value
+                for i in self._get_indices(cls, names)]
+
+    def decode(self, row: Sequence[Any],
+               loaded_properties: frozenset[str] | None = None) -> 'BaseModel':
+        assert self.id_index is not None and self.type_index is not None
+        rid = row[self.id_index]
+        # Rows of nodes already loaded in the current identity map resolve to their instance
+        instance = _lookup(rid)
+        if instance is not None:
+            return instance
+
+        model_cls, indices, properties_set = self._get_plan(row[self.type_index])
+        # Builds the node without going through the dataclass __init__
+        instance = object.__new__(model_cls)
+        instance._values = [None if i is None or (value := row[i]) == '  cypher.null' else value
+                            for i in indices]
+        instance._rid = rid
+        if loaded_properties is not None:
+            instance._deferred_properties = properties_set - loaded_properties
+        return _register(instance)
+
+    def decode_properties(self, row: Sequence[Any], properties_cls):
+        return properties_cls(*self.values(row, properties_cls,
+                                           properties_cls._properties_names))
+
+
+class _HydrationPlan(NamedTuple):
+    model_cls: Type['BaseModel']
+    indices: tuple[int | None, ...]
+    properties_set: frozenset[str]
+
+
 TModel = TypeVar('TModel', bound='BaseModel')
 P = ParamSpec('P')
 
+Request = tuple[Query, Params]
+
+_AGGREGATE_FUNCTIONS = frozenset(('count', 'sum', 'min', 'max', 'avg'))
+
+
+class EdgeOperation(NamedTuple):
+    link: bool
+    relation_name: str
+    source: 'BaseModel'
+    target: 'BaseModel'
+    properties: dict[str, Any] | None = None
+
+
+def _get_edges_request(relation_name: str, link: bool, rows: list[dict[str, Any]],
+                       with_properties: bool = False) -> Request:
+    if not link:
+        query = ('unwind %(rows)s as r match (s)-[e:%(rel_type_name)s]->(t) '
+                 'where id(s) = r.s and id(t) = r.t delete e')
+    elif with_properties:
+        query = ('unwind %(rows)s as r match (s), (t) where id(s) = r.s and id(t) = r.t '
+                 'create (s)-[e:%(rel_type_name)s]->(t) set e = r.p')
+    else:
+        query = ('unwind %(rows)s as r match (s), (t) where id(s) = r.s and id(t) = r.t '
+                 'create (s)-[:%(rel_type_name)s]->(t)')
+    return cast(Query, query), {'rows': rows, 'rel_type_name': Label(relation_name)}
+
+
+def _get_schema_fingerprint(requests: Sequence[Request]) -> str:
+    digest = hashlib.sha256()
+    for query, params in requests:
+        digest.update(query.encode('utf-8'))
+        for name, value in sorted(params.items()):
+            value = value.label_name if isinstance(value, Label) else repr(value)
+            digest.update(f'\0{name}={value}'.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+async def _execute_requests(
+    cursor: AkiraAsyncClientCursor, requests: Sequence[tuple[Sequence['BaseModel'], Request]],
+    pipeline: bool = False, pipeline_batch_size: int = 1000,
+    on_result: Callable[[Sequence['BaseModel'], AkiraAsyncClientCursor], Awaitable[None]]
+    | None = None, sql: bool = False
+):
+    if not pipeline:
+        for nodes, request in requests:
+            if sql:
+                await cursor.execute_sql(*request)
+            else:
+                await cursor.execute_cypher(*request)
+            if on_result:
+                await on_result(nodes, cursor)
+        return
+
+    conn = cursor.connection
+    async with conn.pipeline() as conn_pipeline:
+        for batch in _chunks(requests, pipeline_batch_size):
+            # Every request gets its own cursor to keep its results until the batch is synced
+            cursors: list[tuple[Sequence[BaseModel], AkiraAsyncClientCursor]] = []
+            try:
+                for nodes, request in batch:
+                    request_cursor = cast(AkiraAsyncClientCursor, conn.cursor())
+                    cursors.append((nodes, request_cursor))
+                    if sql:
+                        await request_cursor.execute_sql(*request)
+                    else:
+                        await request_cursor.execute_cypher(*request)
+                await conn_pipeline.sync()
+            except psycopg.Error as e:
+                # Results are attached in order, the first request without any is the failed one
+                failed_nodes = next((nodes for nodes, request_cursor in cursors
+                                     if request_cursor.pgresult is None), [])
+                raise AkiraPipelinedOperationException(list(failed_nodes)) from e
+
+            for nodes, request_cursor in cursors:
+                if on_result:
+                    await on_result(nodes, request_cursor)
+                await request_cursor.close()
+
+
+def _get_token_value(value: Any) -> Any:
+    # Datetimes are compared as the milliseconds they are stored as
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return value
+
+
+# Nodes after the given sort keys and rid, in the order of `order_by` then rids.
+# Nulls are ordered as in Cypher: last in ascending order, first in descending order.
+def _get_after_condition(order_by: Sequence[Ordering], values: Sequence[Any],
+                         rid: str) -> Condition:
+    condition: Condition = GreaterThan(RidCondition(), rid)
+    for ordering, value in reversed(list(zip(order_by, values))):
+        property_condition = PropertyCondition(ordering.property_name)
+        after: Condition | None
+        if value is None:
+            equals: Condition = property_condition.is_null()
+            after = ~property_condition.is_null() if ordering.descending else None
+        else:
+            equals = property_condition == value
+            after = (property_condition < value if ordering.descending
+                     else (property_condition > value) | property_condition.is_null())
+        condition = equals & condition if after is None else after | (equals & condition)
+    return condition
+
+
+def _get_identity_key(identifying_properties: dict[str, Any], keys: Sequence[str]) -> Any:
+    values = tuple(identifying_properties[key] for key in keys)
+    try:
+        hash(values)
+    except TypeError:
+        return repr(values)
+    return values
+
+
+# Chunks where each identity appears at most once: a statement only sees the nodes that
+# existed before it, so two rows of the same identity would both be reported as created.
+# Repeated identities go to the following chunks, in their original order.
+def _unique_key_chunks(rows: Sequence[tuple[int, TModel, dict[str, Any]]],
+                       keys: Sequence[str], size: int
+                       ) -> Iterator[Sequence[tuple[int, TModel, dict[str, Any]]]]:
+    rounds: list[list[tuple[int, TModel, dict[str, Any]]]] = []
+    occurrences: dict[Any, int] = {}
+    for row in rows:
+        identity = _get_identity_key(row[2], keys)
+        occurrence = occurrences.get(identity, 0)
+        occurrences[identity] = occurrence + 1
+        if occurrence == len(rounds):
+            rounds.append([])
+        rounds[occurrence].append(row)
+    for round_rows in rounds:
+        yield from _chunks(round_rows, size)
+
+
+@dataclass
+class Page(Generic[TModel]):
+    items: list[TModel]
+    next_token: str | None = None
+
+
+@dataclass
+class UpsertResult:
+    rids: list[str]
+    created: int = 0
+    matched: int = 0
+
 
 class BaseModel(metaclass=MetaModel):
     _properties_names: ClassVar[list[str]]
+    _properties_set: ClassVar[frozenset[str]]
     _relations_names: ClassVar[list[str]]
     _database_connection: ClassVar[DatabaseConnection]
+    _read_cache_config: ClassVar[tuple[int, float | None]]
+    _read_cache: ClassVar[ReadCache | None]
+    _indexes: ClassVar[tuple[Index, ...]]
+    _require_unique_upserts: ClassVar[bool] = False
+    # Properties left out of a projected fetch, they are loaded on demand
+    _deferred_properties = cast(frozenset[str], frozenset())
+
+    # Allocated on the first mutation, read-only nodes only hold their values
+    _operations_queue = cast(list[EdgeOperation] | None, None)
+    _operations_queue_lock = cast(asyncio.Lock | None, None)
+    _changes = cast(dict[str, list[Change]] | None, None)
 
     def __new__(cls, **_):
         instance = super().__new__(cls)
-        instance.property_recorders = {}
+        instance._values = [MISSING] * len(cls._properties_names)
         return instance
 
     def __post_init__(self):
         self._rid: str
-        self._operations_queue = []
-        self._operations_queue_lock = asyncio.Lock()
-        self._properties, self._relations = self._split_properties_and_relations()
-        self.property_recorders: dict[str, PropertyChangesRecorder]
-        for property_name, _ in self._properties.items():
-            self.property_recorders[property_name].clear_changes()
-        for relation_name, relation_value in self._relations.items():
+        self._values: list[Any]
+        for relation_name in self._relations_names:
+            relation_value = self.__dict__[relation_name]
             relation_value._source = self
             relation_value._attribute_name = relation_name
 
+    @property
+    def _properties(self) -> dict[str, Any]:
+        # Deferred properties are not known, writing them would erase the stored values
+        if self._deferred_properties:
+            return {name: value for name, value in zip(self._properties_names, self._values)
+                    if name not in self._deferred_properties}
+        return dict(zip(self._properties_names, self._values))
+
+    def _get_operations_queue_lock(self) -> asyncio.Lock:
+        if self._operations_queue_lock is None:
+            self._operations_queue_lock = asyncio.Lock()
+        return self._operations_queue_lock
+
     @classmethod
-    async def _create_type_and_properties(cls):
-        await cls._database_connection.connect()
+    def _get_schema_requests(cls) -> list[Request]:
+        requests: list[Request] = []
         supertypes = [type.__qualname__ for type in cls.__bases__ if type is not BaseModel]
-        async with cls._database_connection.cursor() as cursor:
-            if supertypes:
-                supertypes_query = []
-                params = {'type_name': Label(cls.__qualname__)}
-                i = 0
-                for supertype in supertypes:
-                    supertype_index = cast(Query, f'supertype{i}')
-                    supertypes_query.append('%(' + supertype_index + ')s')
-                    params[supertype_index] = Label(supertype)
-                    i += 1
+        if supertypes:
+            supertypes_query = []
+            params = {'type_name': Label(cls.__qualname__)}
+            i = 0
+            for supertype in supertypes:
+                supertype_index = cast(Query, f'supertype{i}')
+                supertypes_query.append('%(' + supertype_index + ')s')
+                params[supertype_index] = Label(supertype)
+                i += 1
+            requests.append((
+                cast(Query, 'create vertex type %(type_name)s if not exists extends '
+                     + ','.join(supertypes_query)),
+                params
+            ))
+        else:
+            requests.append((
+                'create vertex type %(type_name)s if not exists',
+                {'type_name': Label(cls.__qualname__)}
+            ))
+        for field in fields(cls):
+            if field.name in cls._properties_names and field.name in cls.__annotations__:
+                requests.append((
+                    'create property %(property_name)s if not exists %(property_type)s',
+                    {
+                        'property_name': Label(f'{cls.__qualname__}.{field.name}'),
+                        'property_type': Label(_get_cypher_property_type(field.type))
+                    }
+                ))
+                if field.default is not MISSING:
+                    requests.append((
+                        'alter property %(property_name)s default %(default_value)s',
+                        {
+                            'property_name': Label(f'{cls.__qualname__}.{field.name}'),
+                            'default_value': field.default
+                        }
+                    ))
+        for index in cls._indexes:
+            requests.append(index._get_create_request(cls.__qualname__))
+        return requests
+
+    @classmethod
+    def _check_upsert_keys(cls, keys: Iterable[str]):
+        if not cls._require_unique_upserts:
+            return
+        keys_set = set(keys)
+        # Indexes of supertypes also cover their subtypes, full text indexes are never unique
+        for model_cls in cls.__mro__:
+            for index in model_cls.__dict__.get('_indexes', ()):
+                if (index.index_type == 'unique'
+                        and keys_set.issuperset(index.properties_names)):
+                    return
+        raise AkiraMissingUniqueIndexException(cls.__qualname__, sorted(keys_set))
+
+    @classmethod
+    async def sync_schema(cls, force: bool = False, pipeline: bool = False):
+        # Syncs every registered subclass, over the connection of each of them, along with the
+        # supertypes they extend, parents first
+        models_by_connection: dict[int, tuple[DatabaseConnection,
+                                              dict[Type[BaseModel], None]]] = {}
+        for model_cls in cast(dict[str, Type[BaseModel]], MetaModel._models).values():
+            if issubclass(model_cls, cls) and hasattr(model_cls, '_database_connection'):
+                database_connection = model_cls._database_connection
+                models = models_by_connection.setdefault(
+                    id(database_connection), (database_connection, {})
+                )[1]
+                for supertype in reversed(model_cls.__mro__):
+                    if issubclass(supertype, BaseModel) and supertype is not BaseModel:
+                        models.setdefault(supertype)
+
+        for database_connection, models in models_by_connection.values():
+            requests = [request for model_cls in models
+                        for request in model_cls._get_schema_requests()]
+            fingerprint = _get_schema_fingerprint(requests)
+            async with database_connection.cursor() as cursor:
+                await cursor.execute_sql('create document type AkiraSchema if not exists')
                 await cursor.execute_sql(
-                    'create vertex type %(type_name)s if not exists extends '
-                    + ','.join(supertypes_query),
-                    params
+                    'select fingerprint from AkiraSchema where name = %(name)s',
+                    {'name': cls.__qualname__}
                 )
-            else:
+                row = await cursor.fetchone()
+                # Unchanged models since the last sync
+                if not force and row is not None and row[0] == fingerprint:
+                    continue
+
+                await _execute_requests(cursor, [((), request) for request in requests],
+                                        pipeline=pipeline, sql=True)
                 await cursor.execute_sql(
-                    'create vertex type %(type_name)s if not exists',
-                    {'type_name': Label(cls.__qualname__)}
+                    'update AkiraSchema set fingerprint = %(fingerprint)s '
+                    'upsert where name = %(name)s',
+                    {'fingerprint': fingerprint, 'name': cls.__qualname__}
                 )
-            for field in fields(cls):
-                if field.name in cls._properties_names and field.name in cls.__annotations__:
-                    await cursor.execute_sql(
-                        'create property %(property_name)s if not exists %(property_type)s',
-                        {
-                            'property_name': Label(f'{cls.__qualname__}.{field.name}'),
-                            'property_type': Label(_get_cypher_property_type(field.type))
-                        }
-                    )
-                    if field.default is not MISSING:
-                        await cursor.execute_sql(
-                            'alter property %(property_name)s default %(default_value)s',
-                            {
-                                'property_name': Label(f'{cls.__qualname__}.{field.name}'),
-                                'default_value': field.default
-                            }
-                        )
-        await cls._database_connection.close()
 
     @classmethod
-    async def bulk_create(cls: Type[TModel], nodes: list[TModel]):
+    async def bulk_create(cls: Type[TModel], nodes: list[TModel], chunk_size: int = 1000,
+                          pipeline: bool = False):
+        # Nodes of a subclass have to be created with their own type
+        requests = [(chunk, model_cls._get_bulk_create_request(chunk))
+                    for model_cls, model_nodes in _group_by_class(nodes).items()
+                    for chunk in _chunks(model_nodes, chunk_size)]
+
+        async def set_rids(chunk: Sequence[BaseModel], cursor: AkiraAsyncClientCursor):
+            rows = await cursor.fetchall()
+            assert len(rows) == len(chunk)
+            for node, (rid,) in zip(chunk, rows):
+                node._rid = rid
+                _register(node)
+
+        async with cls._database_connection.cursor() as cursor:
+            await _execute_requests(cursor, requests, pipeline=pipeline, on_result=set_rids)
+
+    @classmethod
+    async def bulk_upsert(cls: Type[TModel], nodes: list[tuple[TModel, dict[str, Any]]],
+                          chunk_size: int = 1000) -> UpsertResult:
+        # Nodes are merged together when they share the same type and identifying properties,
+        # and whether they have deferred properties to keep
+        groups: dict[tuple[Type[TModel], tuple[str, ...], bool],
+                     list[tuple[int, TModel, dict[str, Any]]]] = {}
+        for i, (node, identifying_properties) in enumerate(nodes):
+            groups.setdefault(
+                (type(node), tuple(sorted(identifying_properties)),
+                 bool(node._deferred_properties)), []
+            ).append((i, node, identifying_properties))
+
+        for model_cls, keys, _ in groups:
+            model_cls._check_upsert_keys(keys)
+
+        result = UpsertResult(rids=[''] * len(nodes))
         async with cls._database_connection.cursor() as cursor:
-            for node in nodes:
-                await cursor.execute_cypher(*node._get_create_request())
-                async for row in cursor:
-                    assert row is not None
-                    node._rid, = row
+            for (model_cls, keys, merge_properties), group in groups.items():
+                # Nodes without identifying properties are created, as upsert() does
+                if not keys:
+                    for chunk in _chunks(group, chunk_size):
+                        await cursor.execute_cypher(*model_cls._get_bulk_create_request(
+                            [node for _, node, _ in chunk]
+                        ))
+                        rows = await cursor.fetchall()
+                        assert len(rows) == len(chunk)
+                        for (i, node, _), (rid,) in zip(chunk, rows):
+                            node._rid = rid
+                            _register(node)
+                            result.rids[i] = rid
+                        result.created += len(chunk)
+                    continue
+
+                for chunk in _unique_key_chunks(group, keys, chunk_size):
+                    await cursor.execute_cypher(*model_cls._get_bulk_upsert_request(
+                        keys, chunk, merge_properties=merge_properties
+                    ))
+                    async for row in cursor:
+                        assert row is not None
+                        i, rid, created = row
+                        nodes[i][0]._rid = rid
+                        nodes[i][0]._invalidate_read_caches()
+                        _register(nodes[i][0])
+                        result.rids[i] = rid
+                        if created:
+                            result.created += 1
+                        else:
+                            result.matched += 1
+
+        return result
 
     @classmethod
-    async def bulk_upsert(cls: Type[TModel], nodes: list[tuple[TModel, dict[str, Any]]]):
+    async def bulk_delete(cls: Type[TModel], nodes: list[TModel], chunk_size: int = 1000):
         async with cls._database_connection.cursor() as cursor:
-            for node, identifying_properties in nodes:
-                await cursor.execute_cypher(
-                    *node._get_create_request(identifying_properties=identifying_properties)
-                )
-                async for row in cursor:
-                    assert row is not None
-                    node._rid, = row
+            for model_cls, model_nodes in _group_by_class(nodes).items():
+                for chunk in _chunks(model_nodes, chunk_size):
+                    await cursor.execute_cypher(*model_cls._get_bulk_delete_request(chunk))
+        for node in nodes:
+            node._invalidate_read_caches()
+            _forget(node._rid)
 
     @classmethod
-    async def bulk_delete(cls: Type[TModel], nodes: list[TModel]):
+    async def delete_where(cls, condition: Condition | bool):
         async with cls._database_connection.cursor() as cursor:
-            for node in nodes:
-                await cursor.execute_cypher(*node._get_delete_request())
+            await cursor.execute_cypher(*cls._get_delete_where_request(condition))
+        cls._clear_read_caches()
 
     def _get_create_request(self, identifying_properties: dict[str, Any] | None = None
                             ) -> tuple[Query, Params]:
         if identifying_properties:
+            # Nodes with deferred properties only update the properties they know
+            set_operator = '+=' if self._deferred_properties else '='
             return (
-                'merge (n:%(type_name)s %(cypher_identifying)s) set n = %(cypher_properties)s '
-                'return id(n)',
+                cast(Query, 'merge (n:%(type_name)s %(cypher_identifying)s) set n '
+                     + set_operator + ' %(cypher_properties)s return id(n)'),
                 {
                     'type_name': Label(self.__class__.__qualname__),
                     'cypher_identifying': identifying_properties,
@@ -189,6 +738,43 @@ class BaseModel(metaclass=MetaModel):
                 }
             )
 
+    @classmethod
+    def _get_bulk_create_request(cls, nodes: Sequence['BaseModel']) -> tuple[Query, Params]:
+        return (
+            'unwind %(rows)s as r create (n:%(type_name)s) set n = r return id(n)',
+            {
+                'type_name': Label(cls.__qualname__),
+                'rows': [node._properties for node in nodes]
+            }
+        )
+
+    @classmethod
+    def _get_bulk_upsert_request(cls, keys: Sequence[str],
+                                 rows: Sequence[tuple[int, 'BaseModel', dict[str, Any]]],
+                                 merge_properties: bool = False) -> tuple[Query, Params]:
+        params: dict[str, Any] = {
+            'type_name': Label(cls.__qualname__),
+            'rows': [{'i': i, 'k': identifying_properties, 'p': node._properties}
+                     for i, node, identifying_properties in rows]
+        }
+
+        keys_query = []
+        for i, key in enumerate(keys):
+            key_id = cast(Query, f'key{i}')
+            keys_query.append('%(' + key_id + ')s:r.k.%(' + key_id + ')s')
+            params[key_id] = Label(key)
+        identifying_query = '{' + ','.join(keys_query) + '}'
+
+        return (
+            'unwind %(rows)s as r '
+            'optional match (m:%(type_name)s ' + identifying_query + ') '
+            'with r, count(m) = 0 as created '
+            'merge (n:%(type_name)s ' + identifying_query + ') '
+            + ('set n += r.p ' if merge_properties else 'set n = r.p ')
+            + 'return r.i, id(n), created',
+            params
+        )
+
     def _get_delete_request(self) -> tuple[Query, Params]:
         return (
             'match (n:%(type_name)s) where id(n) = %(node_id)s detach delete n',
@@ -196,34 +782,139 @@ class BaseModel(metaclass=MetaModel):
         )
 
     @classmethod
-    def _get_fetch_request(cls, rid: str | None = None,
-                           condition: Condition | bool | None = None) -> tuple[Query, Params]:
+    def _get_bulk_delete_request(cls, nodes: Sequence['BaseModel']) -> tuple[Query, Params]:
+        return (
+            'match (n:%(type_name)s) where id(n) in %(node_ids)s detach delete n',
+            {'type_name': Label(cls.__qualname__), 'node_ids': [node._rid for node in nodes]}
+        )
+
+    @classmethod
+    def _get_delete_where_request(cls, condition: Condition | bool) -> tuple[Query, Params]:
+        assert isinstance(condition, Condition)
+        rc, pc = condition._query()
+        return (
+            'match (n:%(type_name)s) where ' + rc + ' detach delete n',
+            dict(**pc, type_name=Label(cls.__qualname__))
+        )
+
+    @classmethod
+    def _get_match_request(cls, rid: str | None = None,
+                           condition: Condition | bool | None = None,
+                           after_rid: str | None = None) -> tuple[Query, dict[str, Any]]:
         req = 'match (n:%(type_name)s) '
         params: dict[str, Any] = {'type_name': Label(cls.__qualname__)}
 
+        where_queries: list[Query] = []
         if condition is not None:
             assert isinstance(condition, Condition)
             rc, pc = condition._query()
-            req += 'where ' + rc + ' '
+            where_queries.append(rc)
             params.update(pc)
 
         if rid is not None:
-            req += 'where id(n) = %(node_id)s '
+            where_queries.append('id(n) = %(node_id)s')
             params['node_id'] = rid
 
-        req += 'return n'
+        if after_rid is not None:
+            where_queries.append('id(n) > %(after_rid)s')
+            params['after_rid'] = after_rid
+
+        if len(where_queries) == 1:
+            req += 'where ' + where_queries[0] + ' '
+        elif where_queries:
+            req += 'where ' + ' and '.join('(' + q + ')' for q in where_queries) + ' '
+
+        return cast(Query, req), params
+
+    @classmethod
+    def _get_aggregate_request(cls, function: str, property_name: str | None = None,
+                               condition: Condition | bool | None = None) -> Request:
+        if function not in _AGGREGATE_FUNCTIONS:
+            raise AkiraUnknownAggregateException(function)
+
+        req, params = cls._get_match_request(condition=condition)
+        if property_name is None:
+            req += f'return {function}(n)'
+        else:
+            req += f'return {function}(%(property_name)s)'
+            params['property_name'] = Label('n.' + property_name)
+        return cast(Query, req), params
+
+    @classmethod
+    def _get_fetch_request(cls, rid: str | None = None,
+                           condition: Condition | bool | None = None,
+                           after_rid: str | None = None, order_by_rid: bool = False,
+                           skip: int | None = None, limit: int | None = None,
+                           fields: Sequence[str] | None = None,
+                           order_by: Sequence[Ordering] = ()) -> tuple[Query, Params]:
+        req, params = cls._get_match_request(rid=rid, condition=condition, after_rid=after_rid)
+
+        if fields is None:
+            req += 'return n'
+        else:
+            fields_query = []
+            for i, field_name in enumerate(fields):
+                field_id = cast(Query, f'field{i}')
+                fields_query.append('%(' + field_id + ')s')
+                params[field_id] = Label('n.' + field_name)
+            req += 'return id(n),labels(n),' + ','.join(fields_query)
+
+        if order_by:
+            orders_query = []
+            for i, ordering in enumerate(order_by):
+                order_id = cast(Query, f'order{i}')
+                orders_query.append('%(' + order_id + ')s'
+                                    + (' desc' if ordering.descending else ''))
+                params[order_id] = Label(ordering.variable + '.' + ordering.property_name)
+            # Rids break ties so that the order is stable between queries
+            req += ' order by ' + ','.join(orders_query) + ',id(n)'
+        elif order_by_rid:
+            req += ' order by id(n)'
+
+        if skip is not None:
+            req += ' skip %(skip)s'
+            params['skip'] = skip
+
+        if limit is not None:
+            req += ' limit %(limit)s'
+            params['limit'] = limit
+
         return (req, params)
 
+    @staticmethod
+    async def _fetch_instances(cursor: AkiraAsyncClientCursor,
+                               fields: Sequence[str] | None = None) -> list['BaseModel']:
+        rows = await cursor.fetchall()
+        if not rows:
+            return []
+
+        decoder = RowDecoder.get(RowDecoder.columns(cursor), None if fields is None else 'n')
+        loaded_properties = None if fields is None else frozenset(fields)
+        return [decoder.decode(row, loaded_properties) for row in rows]
+
+    @staticmethod
+    def _fields_names(fields: Sequence[PropertyCondition] | None) -> list[str] | None:
+        if fields is None:
+            return None
+        return [field.property_name for field in fields]
+
+    @staticmethod
+    def _orderings(order_by: Sequence[Ordering | PropertyCondition] | None) -> list[Ordering]:
+        return [ordering if isinstance(ordering, Ordering) else ordering.asc()
+                for ordering in order_by or ()]
+
     async def create(self):
         async with self._database_connection.cursor() as cursor:
             await cursor.execute_cypher(*self._get_create_request())
             row = await cursor.fetchone()
             assert row is not None
             self._rid, = row
+            _register(self)
 
         return self
 
     async def upsert(self, **identifying_properties):
+        self._check_upsert_keys(identifying_properties)
         async with self._database_connection.cursor() as cursor:
             await cursor.execute_cypher(
                 *self._get_create_request(identifying_properties=identifying_properties)
@@ -231,116 +922,392 @@ class BaseModel(metaclass=MetaModel):
             row = await cursor.fetchone()
             assert row is not None
             self._rid, = row
+            self._invalidate_read_caches()
+            _register(self)
 
         return self
 
+    @classmethod
+    async def aggregate(cls, property: PropertyCondition | str | None, function: str,
+                        condition: Condition | bool | None = None) -> Any:
+        property_name = (property.property_name if isinstance(property, PropertyCondition)
+                         else property)
+        async with cls._database_connection.cursor() as cursor:
+            await cursor.execute_cypher(*cls._get_aggregate_request(function, property_name,
+                                                                    condition))
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    @classmethod
+    async def count(cls, condition: Condition | bool | None = None) -> int:
+        return await cls.aggregate(None, 'count', condition) or 0
+
+    @classmethod
+    async def exists(cls, condition: Condition | bool | None = None) -> bool:
+        req, params = cls._get_match_request(condition=condition)
+        async with cls._database_connection.cursor() as cursor:
+            await cursor.execute_cypher(cast(Query, req + 'return id(n) limit 1'), params)
+            return await cursor.fetchone() is not None
+
     @classmethod
     async def fetch_one(cls: Type[TModel],
-                        condition: Condition | bool | None, rid: str | None = None) -> TModel:
+                        condition: Condition | bool | None, rid: str | None = None,
+                        fields: Sequence[PropertyCondition] | None = None) -> TModel:
+        fields_names = cls._fields_names(fields)
+        # Only whole nodes go through the read cache
+        read_cache = cls._read_cache if fields_names is None else None
+
         if rid:
-            req = cls._get_fetch_request(rid=rid)
+            if read_cache is not None:
+                cached = read_cache.get(rid)
+                if cached is not None:
+                    cached_decoder, cached_row = cached
+                    return cast(TModel, cached_decoder.decode(cached_row))
+            req = cls._get_fetch_request(rid=rid, fields=fields_names)
         elif condition:
-            req = cls._get_fetch_request(condition=condition)
+            req = cls._get_fetch_request(condition=condition, fields=fields_names)
         else:
-            req = cls._get_fetch_request()
+            req = cls._get_fetch_request(fields=fields_names)
 
-        async with cls._database_connection.cursor(row_factory=dict_row) as cursor:
+        async with cls._database_connection.cursor() as cursor:
             await cursor.execute_cypher(*req)
             row = await cursor.fetchone()
             if not row:
                 raise AkiraNodeNotFoundException()
 
-            instance = _parse_cypher_properties({name: value for (name, value) in row.items()
-                                                 if not name.startswith('@')
-                                                 and value is not None},
-                                                MetaModel._models[row['@type']])
-            instance._rid = row['@rid']
+            decoder = RowDecoder.get(RowDecoder.columns(cursor),
+                                     None if fields_names is None else 'n')
+            instance = cast(TModel, decoder.decode(
+                row, None if fields_names is None else frozenset(fields_names)
+            ))
+
+        if rid and read_cache is not None:
+            read_cache.put(rid, (decoder, row))
 
         return instance
 
     @classmethod
-    async def fetch_many(cls: Type[TModel], condition: Condition | bool) -> list[TModel]:
-        instances = []
-        async with cls._database_connection.cursor(row_factory=dict_row) as cursor:
-            await cursor.execute_cypher(*cls._get_fetch_request(condition=condition))
-            async for row in cursor:
-                instance = _parse_cypher_properties({name: value for (name, value) in row.items()
-                                                     if not name.startswith('@')
-                                                     and value is not None},
-                                                    MetaModel._models[row['@type']])
-                instance._rid = row['@rid']
-                instances.append(instance)
+    def read_cache_stats(cls) -> ReadCacheStats | None:
+        if cls._read_cache is None:
+            return None
+        return cls._read_cache.stats()
+
+    def _invalidate_read_caches(self):
+        # The cache of a parent model can hold rows of its subclasses
+        for model_cls in self.__class__.__mro__:
+            read_cache = model_cls.__dict__.get('_read_cache')
+            if read_cache is not None:
+                read_cache.invalidate(self._rid)
+
+    @classmethod
+    def _clear_read_caches(cls):
+        for model_cls in MetaModel._models.values():
+            if model_cls._read_cache is not None \
+                    and (issubclass(model_cls, cls) or issubclass(cls, model_cls)):
+                model_cls._read_cache.clear()
 
+    @classmethod
+    async def fetch_many(cls: Type[TModel], condition: Condition | bool,
+                         prefetch: Sequence[RelationReference] = (),
+                         fields: Sequence[PropertyCondition] | None = None,
+                         order_by: Sequence[Ordering | PropertyCondition] | None = None,
+                         limit: int | None = None, offset: int | None = None) -> list[TModel]:
+        fields_names = cls._fields_names(fields)
+        async with cls._database_connection.cursor() as cursor:
+            await cursor.execute_cypher(*cls._get_fetch_request(
+                condition=condition, fields=fields_names, order_by=cls._orderings(order_by),
+                skip=offset, limit=limit
+            ))
+            instances = cast(list[TModel], await cls._fetch_instances(cursor, fields_names))
+
+        await cls.prefetch(instances, *prefetch)
         return instances
 
     @classmethod
-    async def fetch_all(cls: Type[TModel]) -> list[TModel]:
-        instances = []
-        async with cls._database_connection.cursor(row_factory=dict_row) as cursor:
-            await cursor.execute_cypher(*cls._get_fetch_request())
-            async for row in cursor:
-                instance = _parse_cypher_properties({name: value for (name, value) in row.items()
-                                                     if not name.startswith('@')
-                                                     and value is not None},
-                                                    MetaModel._models[row['@type']])
-                instance._rid = row['@rid']
-                instances.append(instance)
+    async def fetch_all(cls: Type[TModel],
+                        prefetch: Sequence[RelationReference] = (),
+                        fields: Sequence[PropertyCondition] | None = None,
+                        order_by: Sequence[Ordering | PropertyCondition] | None = None,
+                        limit: int | None = None, offset: int | None = None) -> list[TModel]:
+        fields_names = cls._fields_names(fields)
+        async with cls._database_connection.cursor() as cursor:
+            await cursor.execute_cypher(*cls._get_fetch_request(
+                fields=fields_names, order_by=cls._orderings(order_by), skip=offset, limit=limit
+            ))
+            instances = cast(list[TModel], await cls._fetch_instances(cursor, fields_names))
 
+        await cls.prefetch(instances, *prefetch)
         return instances
 
-    async def _add_operation(self, operation):
-        async with self._operations_queue_lock:
-            self._operations_queue.append(operation)
+    @classmethod
+    async def fetch_page(cls: Type[TModel], condition: Condition | bool | None = None,
+                         order_by: Sequence[Ordering | PropertyCondition] | None = None,
+                         limit: int = 50, token: str | None = None,
+                         prefetch: Sequence[RelationReference] = (),
+                         fields: Sequence[PropertyCondition] | None = None) -> 'Page[TModel]':
+        orderings = cls._orderings(order_by)
+        if token is not None:
+            *values, rid = json.loads(base64.urlsafe_b64decode(token))
+            after = _get_after_condition(orderings, values, rid)
+            if condition is None:
+                condition = after
+            else:
+                assert isinstance(condition, Condition)
+                condition = condition & after
 
-    def _save_property_changes(self, property_recorder: PropertyChangesRecorder):
-        async def coroutine(cursor: AkiraAsyncClientCursor):
-            queries: list[Query] = []
-            params = {}
+        fields_names = cls._fields_names(fields)
+        if fields_names is not None:
+            # Sort keys are needed to build the token of the next page
+            fields_names += [ordering.property_name for ordering in orderings
+                             if ordering.property_name not in fields_names]
+        async with cls._database_connection.cursor() as cursor:
+            # One more node tells whether there is a next page
+            await cursor.execute_cypher(*cls._get_fetch_request(
+                condition=condition, fields=fields_names, order_by=orderings,
+                order_by_rid=True, limit=limit + 1
+            ))
+            instances = cast(list[TModel], await cls._fetch_instances(cursor, fields_names))
 
-            for i, change in enumerate(property_recorder.changes):
-                q, p = change._query(i)
-                queries.append(q)
-                params.update(p)
+        next_token = None
+        if len(instances) > limit:
+            instances = instances[:limit]
+            last = instances[-1]
+            next_token = base64.urlsafe_b64encode(json.dumps([
+                _get_token_value(last._values[cls._properties_names.index(ordering.property_name)])
+                for ordering in orderings
+            ] + [last._rid]).encode('utf-8')).decode('ascii')
 
-            joined_query = ','.join(queries)
-            await cursor.execute_cypher(
-                'match (n:%(type_name)s) where id(n) = %(node_id)s set ' + joined_query,
-                dict(**params, type_name=Label(self.__class__.__qualname__), node_id=self._rid)
-            )
-        return coroutine
-
-    async def _save(self, cursor) -> None:
-        async with self._operations_queue_lock:
-            for property_recorder in self.property_recorders.values():
-                if property_recorder.changes:
-                    self._operations_queue.append(self._save_property_changes(property_recorder))
-            if self._operations_queue:
-                await asyncio.gather(*[coroutine(cursor) for coroutine in self._operations_queue])
+        await cls.prefetch(instances, *prefetch)
+        return Page(instances, next_token)
+
+    @classmethod
+    def traverse(cls, relation: RelationReference,
+                 start: Condition | Sequence['BaseModel'] | None = None) -> Traversal:
+        return Traversal(cls, start).then(relation)
+
+    @classmethod
+    async def prefetch(cls, nodes: Sequence['BaseModel'], *relations: RelationReference):
+        for relation in relations:
+            await relation.prefetch(nodes)
+
+    @classmethod
+    async def fetch_iter(cls: Type[TModel], condition: Condition | bool | None = None,
+                         batch_size: int = 1000, keyset: bool = True,
+                         prefetch: Sequence[RelationReference] = (),
+                         fields: Sequence[PropertyCondition] | None = None
+                         ) -> AsyncIterator[TModel]:
+        fields_names = cls._fields_names(fields)
+
+        async def fetch_batch(after_rid: str | None, skip: int | None) -> list[TModel]:
+            async with cls._database_connection.cursor() as cursor:
+                await cursor.execute_cypher(*cls._get_fetch_request(
+                    condition=condition, after_rid=after_rid, order_by_rid=True,
+                    skip=skip, limit=batch_size, fields=fields_names
+                ))
+                instances = cast(list[TModel], await cls._fetch_instances(cursor, fields_names))
+            await cls.prefetch(instances, *prefetch)
+            return instances
+
+        batch = await fetch_batch(None, None)
+        fetched = 0
+        next_batch: asyncio.Task[list[TModel]] | None = None
+        try:
+            while batch:
+                fetched += len(batch)
+                # The next batch is fetched while the current one is being consumed
+                if len(batch) == batch_size:
+                    if keyset:
+                        next_batch = asyncio.create_task(fetch_batch(batch[-1]._rid, None))
+                    else:
+                        next_batch = asyncio.create_task(fetch_batch(None, fetched))
+                for instance in batch:
+                    yield instance
+                batch = await next_batch if next_batch else []
+                next_batch = None
+        finally:
+            # Cancelling a running query would leave its connection busy: the batch fetched
+            # in advance is awaited and dropped instead
+            if next_batch:
+                with contextlib.suppress(Exception):
+                    await next_batch
+
+    def _add_edge_operation(self, operation: EdgeOperation):
+        if self._operations_queue is None:
+            self._operations_queue = []
+        self._operations_queue.append(operation)
+
+    @staticmethod
+    def _get_set_clause(changes: Sequence[tuple[str, list[Change]]],
+                        value: Callable[[str, Change], str], params: dict[str, Any]) -> str:
+        assignments: list[str] = []
+        for i, (property_name, property_changes) in enumerate(changes):
+            property_id = f'property{i}'
+            params[property_id] = Label('n.' + property_name)
+            expression = '%(' + property_id + ')s'
+            for j, change in enumerate(property_changes):
+                expression = change._apply(expression if j == 0 else f'({expression})',
+                                           value(f'value{i}_{j}', change))
+            assignments.append('%(' + property_id + ')s = ' + expression)
+        return ','.join(assignments)
+
+    def _get_property_changes_request(self, changes: Sequence[tuple[str, list[Change]]]
+                                      ) -> Request:
+        params: dict[str, Any] = {}
+
+        def value(value_id: str, change: Change) -> str:
+            params[value_id] = change._value
+            return '%(' + value_id + ')s'
+
+        # All the changed properties of the node are set by a single statement
+        set_clause = self._get_set_clause(changes, value, params)
+        return (
+            cast(Query, 'match (n:%(type_name)s) where id(n) = %(node_id)s set ' + set_clause),
+            dict(**params, type_name=Label(self.__class__.__qualname__), node_id=self._rid)
+        )
+
+    @classmethod
+    def _get_bulk_property_changes_request(
+        cls, nodes_changes: Sequence[tuple['BaseModel', list[tuple[str, list[Change]]]]]
+    ) -> Request:
+        params: dict[str, Any] = {'type_name': Label(cls.__qualname__)}
+        # The nodes share the same changed properties and kinds of changes, only values differ
+        set_clause = cls._get_set_clause(nodes_changes[0][1],
+                                         lambda value_id, _: 'r.' + value_id, params)
+        params['rows'] = [
+            dict(((f'value{i}_{j}', change._value)
+                  for i, (_, property_changes) in enumerate(changes)
+                  for j, change in enumerate(property_changes)), rid=node._rid)
+            for node, changes in nodes_changes
+        ]
+        return (
+            cast(Query, 'unwind %(rows)s as r match (n:%(type_name)s) where id(n) = r.rid set '
+                 + set_clause),
+            params
+        )
+
+    async def _pop_operations(self) -> tuple[list[EdgeOperation],
+                                             dict[str, list[Change]] | None]:
+        if self._operations_queue is None and self._changes is None:
+            return [], None
+
+        async with self._get_operations_queue_lock():
+            operations, changes = self._operations_queue or [], self._changes
+            self._operations_queue = None
+            self._changes = None
+        return operations, changes
+
+    async def _restore_operations(self, operations: list[EdgeOperation],
+                                  changes: dict[str, list[Change]] | None):
+        async with self._get_operations_queue_lock():
+            if self._operations_queue is None:
                 self._operations_queue = []
+            self._operations_queue[:0] = operations
+            if changes:
+                if self._changes is None:
+                    self._changes = {}
+                for property_name, property_changes in changes.items():
+                    self._changes[property_name] = (property_changes
+                                                    + self._changes.get(property_name, []))
+
+    async def _save(self, cursor, pipeline: bool = False) -> None:
+        await BaseModel._save_nodes(cursor, [self], pipeline=pipeline)
+
+    @staticmethod
+    def _get_save_requests(operations: Sequence[tuple['BaseModel', list[EdgeOperation],
+                                                      dict[str, list[Change]] | None]],
+                           chunk_size: int) -> list[tuple[Sequence['BaseModel'], Request]]:
+        requests: list[tuple[Sequence[BaseModel], Request]] = []
+        # Edge operations are grouped by relation and kind of operation, a link following an
+        # unlink of the same relation on a node (or the opposite) goes in a later statement
+        edges_groups: dict[tuple[int, str, bool, bool],
+                           list[tuple[BaseModel, EdgeOperation]]] = {}
+        for node, edge_operations, _ in operations:
+            runs: dict[str, tuple[bool, int]] = {}
+            for edge_operation in edge_operations:
+                link, run = runs.get(edge_operation.relation_name, (edge_operation.link, 0))
+                if link != edge_operation.link:
+                    run += 1
+                runs[edge_operation.relation_name] = (edge_operation.link, run)
+                edges_groups.setdefault(
+                    (run, edge_operation.relation_name, edge_operation.link,
+                     edge_operation.properties is not None), []
+                ).append((node, edge_operation))
+        for (_, relation_name, link, with_properties), edges_group in sorted(
+            edges_groups.items(), key=lambda item: item[0][0]
+        ):
+            for edges_chunk in _chunks(edges_group, chunk_size):
+                rows: list[dict[str, Any]] = [
+                    {'s': edge_operation.source._rid, 't': edge_operation.target._rid}
+                    for _, edge_operation in edges_chunk
+                ]
+                if with_properties:
+                    for row, (_, edge_operation) in zip(rows, edges_chunk):
+                        row['p'] = edge_operation.properties
+                requests.append((list({id(node): node for node, _ in edges_chunk}.values()),
+                                 _get_edges_request(relation_name, link, rows, with_properties)))
+
+        # Property changes are grouped by class, changed properties and kinds of changes
+        groups: dict[Any, list[tuple[BaseModel, list[tuple[str, list[Change]]]]]] = {}
+        for node, _, changes in operations:
+            if changes:
+                coalesced = [(property_name, _coalesce_changes(changes[property_name]))
+                             for property_name in sorted(changes)]
+                shape = tuple((property_name, tuple(type(change) for change in property_changes))
+                              for property_name, property_changes in coalesced)
+                groups.setdefault((type(node), shape), []).append((node, coalesced))
+        for (model_cls, _), group in groups.items():
+            for chunk in _chunks(group, chunk_size):
+                if len(chunk) == 1:
+                    node, coalesced = chunk[0]
+                    requests.append(([node], node._get_property_changes_request(coalesced)))
+                else:
+                    requests.append(([node for node, _ in chunk],
+                                     model_cls._get_bulk_property_changes_request(chunk)))
+        return requests
+
+    @staticmethod
+    async def _save_nodes(cursor, nodes: Sequence['BaseModel'], pipeline: bool = False,
+                          chunk_size: int = 1000):
+        operations = [(node, *await node._pop_operations()) for node in nodes]
+
+        # Pending operations are given back if the requests cannot be built or executed
+        try:
+            requests = BaseModel._get_save_requests(operations, chunk_size)
+            await _execute_requests(cursor, requests, pipeline=pipeline)
+        except BaseException:
+            for node, edge_operations, changes in operations:
+                await node._restore_operations(edge_operations, changes)
+            raise
+
+        for node, _, changes in operations:
+            if changes:
+                node._invalidate_read_caches()
 
-    async def save(self):
+    async def save(self, pipeline: bool = False):
         async with self._database_connection.cursor() as cursor:
-            await self._save(cursor)
+            await self._save(cursor, pipeline=pipeline)
 
     @staticmethod
-    async def bulk_save(nodes: list[TModel]):
+    async def bulk_save(nodes: list[TModel], pipeline: bool = False, chunk_size: int = 1000):
         if nodes:
             async with nodes[0]._database_connection.cursor() as cursor:
-                await asyncio.gather(*[node._save(cursor) for node in nodes])
+                await BaseModel._save_nodes(cursor, nodes, pipeline=pipeline,
+                                            chunk_size=chunk_size)
 
     async def delete(self) -> None:
         async with self._database_connection.cursor() as cursor:
             await cursor.execute_cypher(*self._get_delete_request())
+        self._invalidate_read_caches()
+        _forget(self._rid)
 
     async def load(self) -> None:
         if not self._rid:
             raise AkiraUnknownNodeException()
 
-        async with self._operations_queue_lock:
-            if self._operations_queue:
-                self._operations_queue = []
+        async with self._get_operations_queue_lock():
+            self._operations_queue = None
 
-        async with self._database_connection.cursor(row_factory=dict_row) as cursor:
+        async with self._database_connection.cursor() as cursor:
             await cursor.execute_cypher(
                 'match (n:%(type_name)s) where id(n) = %(node_id)s return n',
                 {'type_name': Label(self.__class__.__qualname__), 'node_id': self._rid}
@@ -349,19 +1316,37 @@ class BaseModel(metaclass=MetaModel):
                 if row is None:
                     raise AkiraUnknownNodeException()
                 else:
-                    for name, value in row.items():
-                        if not name.startswith('@'):
-                            setattr(self, name, value)
-
-    def _split_properties_and_relations(self):
-        properties: dict[str, Any] = {}
-        relations: dict[str, 'Relation[BaseModel]'] = {}
-
-        for field in fields(self):
-            field_value = getattr(self, field.name)
-            if field.name in self.__class__._relations_names:
-                relations[field.name] = field_value
-            else:
-                properties[field.name] = field_value
+                    decoder = RowDecoder.get(RowDecoder.columns(cursor))
+                    properties_names = self._properties_names
+                    # Also clears the deferred properties, only once they were actually loaded
+                    self._set_loaded_properties(dict(zip(
+                        properties_names, decoder.values(row, self.__class__, properties_names)
+                    )))
+
+    async def load_deferred(self) -> None:
+        if not self._deferred_properties:
+            return
+        if not self._rid:
+            raise AkiraUnknownNodeException()
+
+        deferred_properties = list(self._deferred_properties)
+        async with self._database_connection.cursor() as cursor:
+            await cursor.execute_cypher(*self._get_fetch_request(rid=self._rid,
+                                                                 fields=deferred_properties))
+            row = await cursor.fetchone()
+            if row is None:
+                raise AkiraUnknownNodeException()
+            decoder = RowDecoder.get(RowDecoder.columns(cursor), 'n')
+            properties_names = self._properties_names
+            values = dict(zip(properties_names,
+                              decoder.values(row, self.__class__, properties_names)))
+            self._set_loaded_properties({name: values[name] for name in deferred_properties})
 
-        return properties, relations
+    def _set_loaded_properties(self, values: dict[str, Any]):
+        changes = self._changes
+        for name, value in values.items():
+            if name in self._properties_set:
+                self._values[self._properties_names.index(name)] = value
+                if changes:
+                    changes.pop(name, None)
+        self._deferred_properties = self._deferred_properties - values.keys()
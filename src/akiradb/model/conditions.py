@@ -1,8 +1,61 @@
-from typing import Any, cast
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, cast
 
 from akiradb.types.query import Label, Query, Params
 
 
+class QueryCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class CompiledCondition(NamedTuple):
+    query: Query
+    labels: dict[str, Label]
+    value_names: tuple[str, ...]
+
+
+class _CompiledConditionsCache:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._compiled: OrderedDict[Hashable, CompiledCondition] = OrderedDict()
+
+    def get(self, condition: 'Condition', shape: Hashable, value_id: int) -> CompiledCondition:
+        key = (shape, value_id)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            self.hits += 1
+            self._compiled.move_to_end(key)
+            return compiled
+
+        self.misses += 1
+        parts: list[str] = []
+        labels: dict[str, Label] = {}
+        value_names: list[str] = []
+        condition._compile(value_id, parts, labels, value_names)
+        compiled = CompiledCondition(cast(Query, ''.join(parts)), labels, tuple(value_names))
+
+        self._compiled[key] = compiled
+        if len(self._compiled) > self.maxsize:
+            self._compiled.popitem(last=False)
+        return compiled
+
+    def info(self) -> QueryCacheInfo:
+        return QueryCacheInfo(self.hits, self.misses, self.maxsize, len(self._compiled))
+
+    def clear(self):
+        self.hits = 0
+        self.misses = 0
+        self._compiled.clear()
+
+
+_compiled_conditions = _CompiledConditionsCache()
+
+
 class Condition:
     def __invert__(self) -> 'Not':
         return Not(self)
@@ -34,38 +87,136 @@ class Condition:
     def __xor__(self, o: 'Condition') -> 'Xor':
         return Xor(self, o)
 
-    def _query(self, _: int = 0) -> tuple[Query, Params]:
-        return ('Unknown Condition', {})
+    # Structure of the condition used as cache key, its values are appended to `values`
+    def _shape(self, values: list[Any]) -> Hashable:
+        return ('Unknown Condition',)
+
+    def _compile(self, value_id: int, parts: list[str], labels: dict[str, Label],
+                 value_names: list[str]):
+        parts.append('Unknown Condition')
+
+    def _query(self, value_id: int = 0, variable: str = 'n',
+               edge_variable: str = 'r') -> tuple[Query, Params]:
+        values: list[Any] = []
+        compiled = _compiled_conditions.get(self, self._shape(values), value_id)
+
+        # Conditions are compiled against n and r, other variables only rename their labels
+        params: dict[str, Any] = dict(compiled.labels)
+        if variable != 'n' or edge_variable != 'r':
+            for name, label in compiled.labels.items():
+                if label.label_name == 'n' or label.label_name.startswith('n.'):
+                    params[name] = Label(variable + label.label_name[1:])
+                elif label.label_name == 'r' or label.label_name.startswith('r.'):
+                    params[name] = Label(edge_variable + label.label_name[1:])
+        params.update(zip(compiled.value_names, values))
+        return compiled.query, params
+
+    def _uses_edge(self) -> bool:
+        compiled = _compiled_conditions.get(self, self._shape([]), 0)
+        return any(label.label_name == 'r' or label.label_name.startswith('r.')
+                   for label in compiled.labels.values())
+
+    @staticmethod
+    def cache_info() -> QueryCacheInfo:
+        return _compiled_conditions.info()
+
+    @staticmethod
+    def cache_clear():
+        _compiled_conditions.clear()
+
 
+class Ordering(NamedTuple):
+    property_name: str
+    descending: bool = False
+    variable: str = 'n'
 
+
+# Properties of nodes are matched as n, those of edges as r
 class PropertyCondition(Condition):
-    def __init__(self, property_name: str):
+    def __init__(self, property_name: str, variable: str = 'n'):
         self.property_name = property_name
+        self.variable = variable
+
+    def asc(self) -> Ordering:
+        return Ordering(self.property_name, variable=self.variable)
+
+    def desc(self) -> Ordering:
+        return Ordering(self.property_name, descending=True, variable=self.variable)
+
+    def is_null(self) -> 'IsNull':
+        return IsNull(self)
+
+    def _shape(self, values: list[Any]) -> Hashable:
+        return ('property', self.variable, self.property_name)
 
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        value_name = cast(Query, f'value{value_id}')
-        return ('%(' + value_name + ')s', {value_name: Label('n.' + self.property_name)})
+    def _compile(self, value_id: int, parts: list[str], labels: dict[str, Label],
+                 value_names: list[str]):
+        value_name = f'value{value_id + len(labels) + len(value_names)}'
+        parts.append('%(' + value_name + ')s')
+        labels[value_name] = Label(self.variable + '.' + self.property_name)
+
+
+class RidCondition(Condition):
+    def __init__(self, variable: str = 'n'):
+        self.variable = variable
+
+    def _shape(self, values: list[Any]) -> Hashable:
+        return ('rid', self.variable)
+
+    def _compile(self, value_id: int, parts: list[str], labels: dict[str, Label],
+                 value_names: list[str]):
+        value_name = f'value{value_id + len(labels) + len(value_names)}'
+        parts.append('id(%(' + value_name + ')s)')
+        labels[value_name] = Label(self.variable)
 
 
 class ValueCondition(Condition):
     def __init__(self, value: Any):
         self.value = value
 
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        value_name = cast(Query, f'value{value_id}')
-        return ('%(' + value_name + ')s', {value_name: self.value})
+    def _shape(self, values: list[Any]) -> Hashable:
+        values.append(self.value)
+        return ('value',)
+
+    def _compile(self, value_id: int, parts: list[str], labels: dict[str, Label],
+                 value_names: list[str]):
+        value_name = f'value{value_id + len(labels) + len(value_names)}'
+        parts.append('%(' + value_name + ')s')
+        value_names.append(value_name)
 
 
 class Not(Condition):
     def __init__(self, condition: Condition):
         self.condition = condition
 
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        q, p = self.condition._query(value_id)
-        return ('not (' + q + ')', p)
+    def _shape(self, values: list[Any]) -> Hashable:
+        return ('not', self.condition._shape(values))
+
+    def _compile(self, value_id: int, parts: list[str], labels: dict[str, Label],
+                 value_names: list[str]):
+        parts.append('not (')
+        self.condition._compile(value_id, parts, labels, value_names)
+        parts.append(')')
+
+
+class IsNull(Condition):
+    def __init__(self, condition: Condition):
+        self.condition = condition
+
+    def _shape(self, values: list[Any]) -> Hashable:
+        return ('is null', self.condition._shape(values))
+
+    def _compile(self, value_id: int, parts: list[str], labels: dict[str, Label],
+                 value_names: list[str]):
+        self.condition._compile(value_id, parts, labels, value_names)
+        parts.append(' is null')
 
 
 class BinaryCondition(Condition):
+    _prefix = ''
+    _operator = ''
+    _suffix = ''
+
     def __init__(self, condition1: Condition, condition2: Condition | Any):
         self.condition1 = condition1
         if isinstance(condition2, Condition):
@@ -73,65 +224,55 @@ class BinaryCondition(Condition):
         else:
             self.condition2 = ValueCondition(condition2)
 
+    def _shape(self, values: list[Any]) -> Hashable:
+        return (self._operator, self.condition1._shape(values), self.condition2._shape(values))
+
+    def _compile(self, value_id: int, parts: list[str], labels: dict[str, Label],
+                 value_names: list[str]):
+        parts.append(self._prefix)
+        self.condition1._compile(value_id, parts, labels, value_names)
+        parts.append(self._operator)
+        self.condition2._compile(value_id, parts, labels, value_names)
+        parts.append(self._suffix)
+
 
 class Equals(BinaryCondition):
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        q1, p1 = self.condition1._query(value_id)
-        q2, p2 = self.condition2._query(value_id + len(p1))
-        return (q1 + ' = ' + q2, dict(**p1, **p2))
+    _operator = ' = '
 
 
 class NotEquals(BinaryCondition):
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        q1, p1 = self.condition1._query(value_id)
-        q2, p2 = self.condition2._query(value_id + len(p1))
-        return (q1 + ' <> ' + q2, dict(**p1, **p2))
+    _operator = ' <> '
 
 
 class LowerThan(BinaryCondition):
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        q1, p1 = self.condition1._query(value_id)
-        q2, p2 = self.condition2._query(value_id + len(p1))
-        return (q1 + ' < ' + q2, dict(**p1, **p2))
+    _operator = ' < '
 
 
 class LowerEquals(BinaryCondition):
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        q1, p1 = self.condition1._query(value_id)
-        q2, p2 = self.condition2._query(value_id + len(p1))
-        return (q1 + ' <= ' + q2, dict(**p1, **p2))
+    _operator = ' <= '
 
 
 class GreaterThan(BinaryCondition):
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        q1, p1 = self.condition1._query(value_id)
-        q2, p2 = self.condition2._query(value_id + len(p1))
-        return (q1 + ' > ' + q2, dict(**p1, **p2))
+    _operator = ' > '
 
 
 class GreaterEquals(BinaryCondition):
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        q1, p1 = self.condition1._query(value_id)
-        q2, p2 = self.condition2._query(value_id + len(p1))
-        return (q1 + ' >= ' + q2, dict(**p1, **p2))
+    _operator = ' >= '
 
 
 class And(BinaryCondition):
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        q1, p1 = self.condition1._query(value_id)
-        q2, p2 = self.condition2._query(value_id + len(p1))
-        return ('(' + q1 + ') and (' + q2 + ')', dict(**p1, **p2))
+    _prefix = '('
+    _operator = ') and ('
+    _suffix = ')'
 
 
 class Or(BinaryCondition):
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        q1, p1 = self.condition1._query(value_id)
-        q2, p2 = self.condition2._query(value_id + len(p1))
-        return ('(' + q1 + ') or (' + q2 + ')', dict(**p1, **p2))
+    _prefix = '('
+    _operator = ') or ('
+    _suffix = ')'
 
 
 class Xor(BinaryCondition):
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        q1, p1 = self.condition1._query(value_id)
-        q2, p2 = self.condition2._query(value_id + len(p1))
-        return ('(' + q1 + ') xor (' + q2 + ')', dict(**p1, **p2))
+    _prefix = '('
+    _operator = ') xor ('
+    _suffix = ')'
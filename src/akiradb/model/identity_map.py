@@ -0,0 +1,62 @@
+import contextlib
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Iterator
+from weakref import WeakValueDictionary
+
+if TYPE_CHECKING:
+    from akiradb.model.base_model import BaseModel
+
+
+class IdentityMap():
+    def __init__(self):
+        self._instances: WeakValueDictionary[str, 'BaseModel'] = WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def __contains__(self, rid: str) -> bool:
+        return rid in self._instances
+
+    def get(self, rid: str) -> 'BaseModel | None':
+        return self._instances.get(rid)
+
+    def add(self, instance: 'BaseModel') -> 'BaseModel':
+        # An instance already loaded for this rid always wins
+        return self._instances.setdefault(instance._rid, instance)
+
+    def discard(self, rid: str):
+        self._instances.pop(rid, None)
+
+
+_current_identity_map: ContextVar[IdentityMap | None] = ContextVar('akiradb_identity_map',
+                                                                   default=None)
+
+
+@contextlib.contextmanager
+def identity_map() -> Iterator[IdentityMap]:
+    current = IdentityMap()
+    token = _current_identity_map.set(current)
+    try:
+        yield current
+    finally:
+        _current_identity_map.reset(token)
+
+
+def _lookup(rid: str) -> 'BaseModel | None':
+    current = _current_identity_map.get()
+    if current is None:
+        return None
+    return current.get(rid)
+
+
+def _register(instance: 'BaseModel') -> 'BaseModel':
+    current = _current_identity_map.get()
+    if current is None:
+        return instance
+    return current.add(instance)
+
+
+def _forget(rid: str):
+    current = _current_identity_map.get()
+    if current is not None:
+        current.discard(rid)
@@ -0,0 +1,44 @@
+from dataclasses import MISSING, field
+from typing import Any, Callable, cast
+
+from akiradb.types.query import Label, Params, Query
+
+
+class Index():
+    def __init__(self, *properties_names: str, unique: bool = False, full_text: bool = False):
+        self.properties_names = properties_names
+        self.unique = unique
+        self.full_text = full_text
+
+    @property
+    def index_type(self) -> str:
+        if self.full_text:
+            return 'full_text'
+        return 'unique' if self.unique else 'notunique'
+
+    def _get_create_request(self, type_name: str) -> tuple[Query, Params]:
+        params = {'type_name': Label(type_name), 'index_type': Label(self.index_type)}
+        properties_query = []
+        for i, property_name in enumerate(self.properties_names):
+            property_id = cast(Query, f'property{i}')
+            properties_query.append('%(' + property_id + ')s')
+            params[property_id] = Label(property_name)
+        return (
+            'create index if not exists on %(type_name)s (' + ','.join(properties_query) + ') '
+            '%(index_type)s',
+            params
+        )
+
+    def __repr__(self) -> str:
+        return (f'Index({", ".join(map(repr, self.properties_names))}, '
+                f'index_type={self.index_type!r})')
+
+
+def indexed(default: Any = MISSING, *, default_factory: Callable[[], Any] | None = None,
+            unique: bool = False, full_text: bool = False) -> Any:
+    metadata = {'index': Index(unique=unique, full_text=full_text)}
+    if default_factory is not None:
+        if default is not MISSING:
+            raise ValueError('cannot specify both default and default_factory')
+        return field(default_factory=default_factory, metadata=metadata)
+    return field(default=default, metadata=metadata)
@@ -1,11 +1,19 @@
-from typing import Any, cast
-
-from akiradb.types.query import Label, Params, Query
+from dataclasses import MISSING
+from typing import Any
 
 
 class Change():
-    def _query(self, _: int = 0):
-        return ('Unknown Change', {})
+    @property
+    def _value(self) -> Any:
+        return None
+
+    # Expression of the new value, `operand` being the previous one
+    def _apply(self, operand: str, value: str) -> str:
+        return 'Unknown Change'
+
+    # Single change equivalent to this one followed by `change`, if any
+    def _merge(self, change: 'Change') -> 'Change | None':
+        return None
 
 
 class NewValue(Change):
@@ -13,13 +21,21 @@ class NewValue(Change):
         self.property_name = property_name
         self.new_value = new_value
 
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        value_name = cast(Query, f'value{value_id}')
-        property_name = cast(Query, f'property{value_id}')
-        return (
-            '%(' + property_name + ')s = %(' + value_name + ')s',
-            {property_name: Label('n.' + self.property_name), value_name: self.new_value}
-        )
+    @property
+    def _value(self) -> Any:
+        return self.new_value
+
+    def _apply(self, operand: str, value: str) -> str:
+        return value
+
+    def _merge(self, change: Change) -> Change | None:
+        if isinstance(change, Addition):
+            return NewValue(self.property_name, self.new_value + change.add_value)
+        if isinstance(change, Substraction):
+            return NewValue(self.property_name, self.new_value - change.sub_value)
+        if isinstance(change, Multiplication):
+            return NewValue(self.property_name, self.new_value * change.mult_value)
+        return None
 
 
 class Addition(Change):
@@ -27,18 +43,19 @@ class Addition(Change):
         self.property_name = property_name
         self.add_value = add_value
 
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        value_name = cast(Query, f'value{value_id}')
-        property_name = cast(Query, f'property{value_id}')
-        pproperty_name = cast(Query, f'pproperty{value_id}')
-        return (
-            '%(' + property_name + ')s = %(' + pproperty_name + ')s + %(' + value_name + ')s',
-            {
-                property_name: Label('n.' + self.property_name),
-                pproperty_name: Label('n.' + self.property_name),
-                value_name: self.add_value
-            }
-        )
+    @property
+    def _value(self) -> Any:
+        return self.add_value
+
+    def _apply(self, operand: str, value: str) -> str:
+        return operand + ' + ' + value
+
+    def _merge(self, change: Change) -> Change | None:
+        if isinstance(change, Addition):
+            return Addition(self.property_name, self.add_value + change.add_value)
+        if isinstance(change, Substraction):
+            return Addition(self.property_name, self.add_value - change.sub_value)
+        return None
 
 
 class Substraction(Change):
@@ -46,18 +63,19 @@ class Substraction(Change):
         self.property_name = property_name
         self.sub_value = sub_value
 
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        value_name = cast(Query, f'value{value_id}')
-        property_name = cast(Query, f'property{value_id}')
-        pproperty_name = cast(Query, f'pproperty{value_id}')
-        return (
-            '%(' + property_name + ')s = %(' + pproperty_name + ')s - %(' + value_name + ')s',
-            {
-                property_name: Label('n.' + self.property_name),
-                pproperty_name: Label('n.' + self.property_name),
-                value_name: self.sub_value
-            }
-        )
+    @property
+    def _value(self) -> Any:
+        return self.sub_value
+
+    def _apply(self, operand: str, value: str) -> str:
+        return operand + ' - ' + value
+
+    def _merge(self, change: Change) -> Change | None:
+        if isinstance(change, Substraction):
+            return Substraction(self.property_name, self.sub_value + change.sub_value)
+        if isinstance(change, Addition):
+            return Substraction(self.property_name, self.sub_value - change.add_value)
+        return None
 
 
 class Multiplication(Change):
@@ -65,25 +83,68 @@ class Multiplication(Change):
         self.property_name = property_name
         self.mult_value = mult_value
 
-    def _query(self, value_id: int = 0) -> tuple[Query, Params]:
-        value_name = cast(Query, f'value{value_id}')
-        property_name = cast(Query, f'property{value_id}')
-        pproperty_name = cast(Query, f'pproperty{value_id}')
-        return (
-            '%(' + property_name + ')s = %(' + pproperty_name + ')s * %(' + value_name + ')s',
-            {
-                property_name: Label('n.' + self.property_name),
-                pproperty_name: Label('n.' + self.property_name),
-                value_name: self.mult_value
-            }
-        )
+    @property
+    def _value(self) -> Any:
+        return self.mult_value
+
+    def _apply(self, operand: str, value: str) -> str:
+        return operand + ' * ' + value
+
+    def _merge(self, change: Change) -> Change | None:
+        if isinstance(change, Multiplication):
+            return Multiplication(self.property_name, self.mult_value * change.mult_value)
+        return None
+
+
+def _coalesce_changes(changes: list[Change]) -> list[Change]:
+    coalesced: list[Change] = []
+    for change in changes:
+        # A new value overrides everything recorded before it
+        if isinstance(change, NewValue):
+            coalesced = [change]
+            continue
+        merged = None
+        if coalesced:
+            try:
+                merged = coalesced[-1]._merge(change)
+            except TypeError:
+                pass
+        if merged is None:
+            coalesced.append(change)
+        else:
+            coalesced[-1] = merged
+    return coalesced
+
+
+def _add_change(instance, name: str, change: Change):
+    changes = instance._changes
+    if changes is None:
+        changes = instance._changes = {}
+    changes.setdefault(name, []).append(change)
 
 
+# View over a property of a node, values live in the node and changes are only allocated
+# once there is one to record
 class PropertyChangesRecorder():
-    def __init__(self, name: str, value: Any):
+    __slots__ = ('instance', 'name', 'index')
+
+    def __init__(self, instance, name: str, index: int):
+        self.instance = instance
         self.name = name
-        self.value = value
-        self.changes: list[Change] = []
+        self.index = index
+
+    @property
+    def value(self) -> Any:
+        return self.instance._values[self.index]
+
+    @value.setter
+    def value(self, value: Any):
+        self.instance._values[self.index] = value
+
+    @property
+    def changes(self) -> list[Change]:
+        changes = self.instance._changes
+        return changes.get(self.name, []) if changes else []
 
     def __eq__(self, other: Any):
         return self.value == other
@@ -131,26 +192,53 @@ class PropertyChangesRecorder():
         return hash(self.value)
 
     def add_change(self, change: Change):
-        self.changes.append(change)
+        _add_change(self.instance, self.name, change)
 
     def clear_changes(self):
-        self.changes = []
+        if self.instance._changes:
+            self.instance._changes.pop(self.name, None)
+
+
+class DeferredProperty():
+    def __init__(self, instance, name: str):
+        self.instance = instance
+        self.name = name
+
+    def __await__(self):
+        return self._load().__await__()
+
+    async def _load(self):
+        await self.instance.load_deferred()
+        return getattr(self.instance, self.name)
+
+    def __repr__(self) -> str:
+        return '<deferred>'
 
 
 class PropertyChangesRecorderDescriptor():
-    def __init__(self, name: str):
+    def __init__(self, name: str, index: int):
         self.name = name
+        self.index = index
 
     def __get__(self, instance, owner):
-        if self.name in instance.property_recorders:
-            return instance.property_recorders[self.name]
-        else:
-            return getattr(owner, self.name)
+        if instance is None:
+            return self
+        if self.name in instance._deferred_properties:
+            return DeferredProperty(instance, self.name)
+        return PropertyChangesRecorder(instance, self.name, self.index)
 
     def __set__(self, instance, new_value: Any):
-        if self.name in instance.property_recorders:
-            if not isinstance(new_value, PropertyChangesRecorder):
-                instance.property_recorders[self.name].value = new_value
-                instance.property_recorders[self.name].add_change(NewValue(self.name, new_value))
-        else:
-            instance.property_recorders[self.name] = PropertyChangesRecorder(self.name, new_value)
+        if self.name in instance._deferred_properties:
+            instance._deferred_properties = instance._deferred_properties - {self.name}
+        if isinstance(new_value, PropertyChangesRecorder):
+            # In-place operators on this property have already recorded their change
+            if new_value.instance is instance and new_value.name == self.name:
+                return
+            new_value = new_value.value
+
+        values = instance._values
+        # The first assignment, from __init__, is not a change
+        initial = values[self.index] is MISSING
+        values[self.index] = new_value
+        if not initial:
+            _add_change(instance, self.name, NewValue(self.name, new_value))
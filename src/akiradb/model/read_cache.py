@@ -0,0 +1,52 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, NamedTuple
+
+
+class ReadCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class ReadCache():
+    def __init__(self, max_size: int = 1024, ttl: float | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # rid -> (expiration time, fetched row and its decoder)
+        self._entries: OrderedDict[str, tuple[float | None, Any]] = OrderedDict()
+
+    def get(self, rid: str) -> Any | None:
+        entry = self._entries.get(rid)
+        if entry is not None:
+            expires_at, row = entry
+            if expires_at is None or expires_at > monotonic():
+                self.hits += 1
+                self._entries.move_to_end(rid)
+                return row
+            del self._entries[rid]
+            self.evictions += 1
+
+        self.misses += 1
+        return None
+
+    def put(self, rid: str, row: Any):
+        expires_at = monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[rid] = (expires_at, row)
+        self._entries.move_to_end(rid)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, rid: str):
+        self._entries.pop(rid, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> ReadCacheStats:
+        return ReadCacheStats(self.hits, self.misses, self.evictions, len(self._entries))
@@ -1,14 +1,14 @@
-import asyncio
 from contextlib import suppress
 from dataclasses import asdict, dataclass, field, fields
 from functools import partial
-from typing import ClassVar, ForwardRef, Generic, Type, TypeVar, Union, cast
-
-from psycopg.rows import dict_row
-from akiradb.database_connection import AkiraAsyncClientCursor
-
-from akiradb.model.base_model import BaseModel, MetaModel
-from akiradb.model.utils import __dataclass_transform__
+from typing import (Any, AsyncIterator, ClassVar, ForwardRef, Generic, Iterable, Sequence, Type,
+                    TypeVar, Union, cast)
+
+from akiradb.model.base_model import (BaseModel, EdgeOperation, MetaModel, Request, RowDecoder,
+                                      _execute_requests, _get_edges_request)
+from akiradb.model.conditions import (Condition, GreaterThan, Ordering, PropertyCondition,
+                                      RidCondition)
+from akiradb.model.utils import __dataclass_transform__, _chunks
 from akiradb.types.query import Label, Params, Query
 
 TModel = TypeVar('TModel', bound=BaseModel)
@@ -26,50 +26,160 @@ class Relation(Generic[TModel]):
 
     def _link(self, source: BaseModel, target: BaseModel,
               properties: Union['Properties', None] = None):
-        async def coroutine(cursor: AkiraAsyncClientCursor):
-            if properties:
-                await cursor.execute_cypher(
-                    'match (s), (t) where id(s)=%(s_rid)s and id(t)=%(t_rid)s '
-                    'create (s)-[:%(rel_type_name)s %(properties)s]->(t)',
-                    {
-                        'rel_type_name': Label(self._name),
-                        's_rid': source._rid,
-                        't_rid': target._rid,
-                        'properties': asdict(properties)
-                    }
-                )
-            else:
-                await cursor.execute_cypher(
-                    'match (s), (t) where id(s)=%(s_rid)s and id(t)=%(t_rid)s '
-                    'create (s)-[:%(rel_type_name)s]->(t)',
-                    {
-                        'rel_type_name': Label(self._name),
-                        's_rid': source._rid,
-                        't_rid': target._rid
-                    }
-                )
-        return coroutine
+        assert self._source
+        self._source._add_edge_operation(EdgeOperation(
+            True, self._name, source, target, asdict(properties) if properties else None
+        ))
 
     def _unlink(self, source: BaseModel, target: BaseModel):
-        async def coroutine(cursor: AkiraAsyncClientCursor):
-            await cursor.execute_cypher(
-                'match (s)-[r:%(rel_type_name)s]->(t) where id(s)=%(s_rid)s and id(t)=%(t_rid)s '
-                'delete r',
-                {'rel_type_name': Label(self._name), 's_rid': source._rid, 't_rid': target._rid}
-            )
-        return coroutine
-
-    def _get_target_match_request(self, target_cls, properties_cls=None) -> tuple[Query, Params]:
         assert self._source
-        query = ('match (n1:%(n1_type_name)s) -[r:%(rel_type_name)s]-> (n2:%(n2_type_name)s) '
-                 + 'where id(n1) = %(n1_rid)s return id(n2),labels(n2),')
-        params = {
-            'n1_type_name': Label(self._source.__class__.__qualname__),
+        self._source._add_edge_operation(EdgeOperation(False, self._name, source, target))
+
+    async def bulk_link(self, pairs: Iterable[tuple[BaseModel, BaseModel]
+                                              | tuple[BaseModel, BaseModel, 'Properties']],
+                        chunk_size: int = 1000, pipeline: bool = False):
+        requests: list[tuple[Sequence[BaseModel], Request]] = []
+        database_connection = None
+        for chunk in _chunks(list(pairs), chunk_size):
+            database_connection = chunk[0][0]._database_connection
+            for reverse in ((False, True) if self._bidirectionnal else (False,)):
+                rows: list[dict[str, Any]] = []
+                rows_with_properties: list[dict[str, Any]] = []
+                for source, target, *properties in chunk:
+                    if reverse:
+                        source, target = target, source
+                    if properties and properties[0]:
+                        rows_with_properties.append({'s': source._rid, 't': target._rid,
+                                                     'p': asdict(properties[0])})
+                    else:
+                        rows.append({'s': source._rid, 't': target._rid})
+                nodes = [pair[0] for pair in chunk]
+                if rows:
+                    requests.append((nodes, _get_edges_request(self._name, True, rows)))
+                if rows_with_properties:
+                    requests.append((nodes, _get_edges_request(self._name, True,
+                                                               rows_with_properties, True)))
+
+            # Loaded relations of the linked nodes are reloaded on their next access
+            for source, target, *_ in chunk:
+                for node in ((source, target) if self._bidirectionnal else (source,)):
+                    relation = node.__dict__.get(self._attribute_name)
+                    if relation is not None:
+                        relation._loaded = False
+
+        if database_connection is not None:
+            async with database_connection.cursor() as cursor:
+                await _execute_requests(cursor, requests, pipeline=pipeline)
+
+    def _get_target_cls(self) -> Type[TModel]:
+        ref = self.__orig_class__.__args__[0]  # type: ignore[attr-defined]
+        if isinstance(ref, ForwardRef):
+            ref = MetaModel._models[ref.__forward_arg__]
+        return ref
+
+    def _get_properties_cls(self) -> Union[Type['Properties'], None]:
+        args = self.__orig_class__.__args__  # type: ignore[attr-defined]
+        if len(args) < 2:
+            return None
+        ref = args[1]
+        if isinstance(ref, ForwardRef):
+            ref = MetaProperties._properties[ref.__forward_arg__]
+        return ref
+
+    def _fill(self, rows: list[tuple], columns: tuple[str, ...]):
+        raise NotImplementedError()
+
+    async def _load(self):
+        assert self._source
+        req = self._get_target_match_request(self._get_target_cls(),
+                                             properties_cls=self._get_properties_cls())
+        async with self._source._database_connection.cursor() as cursor:
+            await cursor.execute_cypher(*req)
+            rows = await cursor.fetchall()
+            self._fill(rows, RowDecoder.columns(cursor))
+
+    async def _prefetch(self, source_cls: Type[BaseModel], nodes: Sequence[BaseModel],
+                        chunk_size: int = 1000):
+        target_cls = self._get_target_cls()
+        properties_cls = self._get_properties_cls()
+        rows_by_source: dict[str, list[tuple]] = {node._rid: [] for node in nodes}
+        columns: tuple[str, ...] = ()
+
+        async with source_cls._database_connection.cursor() as cursor:
+            for chunk in _chunks(list(rows_by_source), chunk_size):
+                await cursor.execute_cypher(*self._get_target_match_request(
+                    target_cls, properties_cls=properties_cls,
+                    source_cls=source_cls, source_rids=chunk
+                ))
+                rows = await cursor.fetchall()
+                # Results without rows have no columns, their sources have no targets
+                if not rows:
+                    continue
+                columns = RowDecoder.columns(cursor)
+                source_index = columns.index('id(n1)')
+                for row in rows:
+                    rows_by_source[row[source_index]].append(row)
+
+        for node in nodes:
+            relation = getattr(node, self._attribute_name)
+            relation._fill(rows_by_source[node._rid], columns)
+            relation._loaded = True
+
+    def _decode_targets(self, rows: list[tuple], columns: tuple[str, ...]) -> list[TModel]:
+        decoder = RowDecoder.get(columns, 'n2')
+        return [cast(TModel, decoder.decode(row)) for row in rows]
+
+    def _decode_properties(self, rows: list[tuple], columns: tuple[str, ...],
+                           properties_cls) -> list:
+        decoder = RowDecoder.get(columns, 'r')
+        return [decoder.decode_properties(row, properties_cls) for row in rows]
+
+    def _get_count_request(self) -> tuple[Query, Params]:
+        assert self._source
+        return (
+            'match (n1:%(n1_type_name)s) -[r:%(rel_type_name)s]-> (n2:%(n2_type_name)s) '
+            'where id(n1) = %(n1_rid)s return count(n2)',
+            {
+                'n1_type_name': Label(self._source.__class__.__qualname__),
+                'rel_type_name': Label(self._name),
+                'n2_type_name': Label(self._get_target_cls().__qualname__),
+                'n1_rid': self._source._rid
+            }
+        )
+
+    def _get_target_match_request(self, target_cls, properties_cls=None,
+                                  source_cls: Type[BaseModel] | None = None,
+                                  source_rids: Sequence[str] | None = None,
+                                  condition: Condition | None = None,
+                                  order_by: Sequence[Ordering] = (),
+                                  skip: int | None = None, limit: int | None = None,
+                                  order_by_edge_rid: bool = False) -> tuple[Query, Params]:
+        query = 'match (n1:%(n1_type_name)s) -[r:%(rel_type_name)s]-> (n2:%(n2_type_name)s) '
+        params: dict[str, Any] = {
             'rel_type_name': Label(self._name),
-            'n2_type_name': Label(target_cls.__qualname__),
-            'n1_rid': self._source._rid
+            'n2_type_name': Label(target_cls.__qualname__)
         }
 
+        # Conditions on the targets are compiled against n2, those on the edges against r
+        condition_query = ''
+        if condition is not None:
+            rc, pc = condition._query(variable='n2')
+            condition_query = ' and (' + rc + ')'
+            params.update(pc)
+
+        if source_rids is None:
+            assert self._source
+            query += ('where id(n1) = %(n1_rid)s' + condition_query
+                      + ' return id(n2),labels(n2),')
+            params['n1_type_name'] = Label(self._source.__class__.__qualname__)
+            params['n1_rid'] = self._source._rid
+        else:
+            assert source_cls
+            query += ('where id(n1) in %(n1_rids)s' + condition_query
+                      + ' return id(n1),id(n2),labels(n2),')
+            params['n1_type_name'] = Label(source_cls.__qualname__)
+            params['n1_rids'] = list(source_rids)
+
         i = 0
         properties_query = []
         for property_name in target_cls._properties_names:
@@ -85,7 +195,59 @@ class Relation(Generic[TModel]):
                 params[property_id] = Label('r.' + property.name)
                 i += 1
 
-        return query + ','.join(properties_query), params
+        query += ','.join(properties_query)
+
+        orders_query = []
+        if order_by:
+            for i, ordering in enumerate(order_by):
+                order_id = cast(Query, f'order{i}')
+                orders_query.append('%(' + order_id + ')s'
+                                    + (' desc' if ordering.descending else ''))
+                variable = 'n2' if ordering.variable == 'n' else ordering.variable
+                params[order_id] = Label(variable + '.' + ordering.property_name)
+        # Edges rather than targets identify rows, a target can be linked more than once
+        if order_by_edge_rid:
+            query += ',id(r)'
+            orders_query.append('id(r)')
+        if orders_query:
+            query += ' order by ' + ','.join(orders_query)
+        if skip is not None:
+            query += ' skip %(skip)s'
+            params['skip'] = skip
+        if limit is not None:
+            query += ' limit %(limit)s'
+            params['limit'] = limit
+
+        return cast(Query, query), params
+
+    async def _fetch_targets(self, where: Condition | None,
+                             order_by: Sequence[Ordering | PropertyCondition] | None,
+                             limit: int | None, skip: int | None = None,
+                             order_by_edge_rid: bool = False
+                             ) -> tuple[list[tuple], tuple[str, ...]]:
+        assert self._source
+        req = self._get_target_match_request(
+            self._get_target_cls(), properties_cls=self._get_properties_cls(),
+            condition=where, order_by=BaseModel._orderings(order_by), skip=skip, limit=limit,
+            order_by_edge_rid=order_by_edge_rid
+        )
+        async with self._source._database_connection.cursor() as cursor:
+            await cursor.execute_cypher(*req)
+            return await cursor.fetchall(), RowDecoder.columns(cursor)
+
+    # Batches of rows straight from the database, loaded elements are left untouched
+    async def _iter_rows(self, batch_size: int, where: Condition | None
+                         ) -> AsyncIterator[tuple[list[tuple], tuple[str, ...]]]:
+        condition = where
+        while True:
+            rows, columns = await self._fetch_targets(condition, None, batch_size,
+                                                      order_by_edge_rid=True)
+            if rows:
+                yield rows, columns
+            if len(rows) < batch_size:
+                break
+            after: Condition = GreaterThan(RidCondition('r'), rows[-1][columns.index('id(r)')])
+            condition = after if where is None else where & after
 
 
 TRelation = TypeVar('TRelation', bound=Relation)
@@ -98,51 +260,58 @@ class Many(Relation[TModel]):
 
     def add(self, element: TModel, invert_operation=False):
         if self._source and not invert_operation:
-            asyncio.create_task(self._source._add_operation(self._link(self._source, element)))
+            self._link(self._source, element)
             if self._bidirectionnal:
-                asyncio.create_task(self._source._add_operation(
-                    self._link(element, self._source)
-                ))
+                self._link(element, self._source)
                 getattr(element, self._attribute_name).add(self._source, invert_operation=True)
         self._elements.append(element)
 
     def remove(self, element: TModel, invert_operation=False):
         if self._source and not invert_operation:
-            asyncio.create_task(self._source._add_operation(self._unlink(self._source, element)))
+            self._unlink(self._source, element)
             if self._bidirectionnal:
-                asyncio.create_task(self._source._add_operation(
-                    self._unlink(element, self._source)
-                ))
+                self._unlink(element, self._source)
                 getattr(element, self._attribute_name).remove(self._source, invert_operation=True)
         with suppress(ValueError):
             self._elements.remove(element)
 
-    async def get(self) -> list[TModel]:
-        if not self._loaded:
-            ref = self.__orig_class__.__args__[0]  # type: ignore[attr-defined]
-            if isinstance(ref, ForwardRef):
-                ref = MetaModel._models[ref.__forward_arg__]
-            target_cls = ref
+    def _fill(self, rows: list[tuple], columns: tuple[str, ...]):
+        self._elements = self._decode_targets(rows, columns)
 
-            assert self._source
-            self._elements = []
-            req = self._get_target_match_request(target_cls)
-            async with self._source._database_connection.cursor(row_factory=dict_row) as cursor:
-                await cursor.execute_cypher(*req)
-                async for row in cursor:
-                    parameters = {name[3:]: value for (name, value) in row.items()
-                                  if name.startswith('n2.') and value is not None
-                                  and value != '  cypher.null'}
-                    inst_cls = MetaModel._models[row['labels(n2)']]
-                    for property_name in inst_cls._properties_names:
-                        if property_name not in parameters.keys():
-                            parameters[property_name] = None
-                    instance = inst_cls(**parameters)
-                    instance._rid = row['id(n2)']
-                    self._elements.append(instance)
+    async def get(self, where: Condition | None = None,
+                  order_by: Sequence[Ordering | PropertyCondition] | None = None,
+                  limit: int | None = None) -> list[TModel]:
+        # Filtered targets are only a view of the relation, they are not kept as its elements
+        if where is not None or order_by is not None or limit is not None:
+            return self._decode_targets(*await self._fetch_targets(where, order_by, limit))
+
+        if not self._loaded:
+            await self._load()
 
         return self._elements
 
+    async def iter(self, batch_size: int = 1000,
+                   where: Condition | None = None) -> AsyncIterator[TModel]:
+        async for rows, columns in self._iter_rows(batch_size, where):
+            for target in self._decode_targets(rows, columns):
+                yield target
+
+    async def page(self, offset: int, limit: int,
+                   where: Condition | None = None) -> list[TModel]:
+        return self._decode_targets(*await self._fetch_targets(where, None, limit, skip=offset,
+                                                               order_by_edge_rid=True))
+
+    async def count(self) -> int:
+        # Loaded relations already know their targets, including the unsaved ones
+        if self._loaded:
+            return len(self._elements)
+
+        assert self._source
+        async with self._source._database_connection.cursor() as cursor:
+            await cursor.execute_cypher(*self._get_count_request())
+            row = await cursor.fetchone()
+        return row[0] if row else 0
+
 
 class One(Relation[TModel]):
     def __init__(self, *args, **kwargs):
@@ -151,48 +320,26 @@ class One(Relation[TModel]):
 
     def set(self, element: TModel, invert_operation=False):
         if self._source and not invert_operation:
-            asyncio.create_task(self._source._add_operation(self._link(self._source, element)))
+            self._link(self._source, element)
             if self._bidirectionnal:
-                asyncio.create_task(self._source._add_operation(
-                    self._link(element, self._source)
-                ))
+                self._link(element, self._source)
                 getattr(element, self._attribute_name).set(self._source, invert_operation=True)
         self._element = element
 
     def unset(self, element: TModel, invert_operation=False):
         if self._source and not invert_operation:
-            asyncio.create_task(self._source._add_operation(self._unlink(self._source, element)))
+            self._unlink(self._source, element)
             if self._bidirectionnal:
-                asyncio.create_task(self._source._add_operation(
-                    self._unlink(element, self._source)
-                ))
+                self._unlink(element, self._source)
                 getattr(element, self._attribute_name).unset(self._source, invert_operation=True)
         self._element = None
 
+    def _fill(self, rows: list[tuple], columns: tuple[str, ...]):
+        self._element = self._decode_targets(rows[:1], columns)[0] if rows else None
+
     async def get(self) -> TModel | None:
         if not self._loaded:
-            ref = self.__orig_class__.__args__[0]  # type: ignore[attr-defined]
-            if isinstance(ref, ForwardRef):
-                ref = MetaModel._models[ref.__forward_arg__]
-            target_cls = ref
-
-            assert self._source
-            self._element = None
-            req = self._get_target_match_request(target_cls)
-            async with self._source._database_connection.cursor(row_factory=dict_row) as cursor:
-                await cursor.execute_cypher(*req)
-                row = await cursor.fetchone()
-                if row:
-                    parameters = {name[3:]: value for (name, value) in row.items()
-                                  if name.startswith('n2.') and value is not None
-                                  and value != '  cypher.null'}
-                    inst_cls = MetaModel._models[row['labels(n2)']]
-                    for property_name in inst_cls._properties_names:
-                        if property_name not in parameters.keys():
-                            parameters[property_name] = None
-                    instance = inst_cls(**parameters)
-                    instance._rid = row['id(n2)']
-                    self._element = instance
+            await self._load()
 
         return self._element
 
@@ -201,6 +348,15 @@ class One(Relation[TModel]):
 class MetaProperties(type):
     _properties: dict[str, 'MetaProperties'] = {}
 
+    def __getattribute__(self, name: str) -> Any:
+        try:
+            properties_names = super().__getattribute__('_properties_names')
+            if name in properties_names:
+                return PropertyCondition(name, variable='r')
+        except AttributeError:
+            pass
+        return super().__getattribute__(name)
+
     def __new__(cls, name, bases, dct):
         instance = cast(Type, super().__new__(cls, name, bases, dct))
         dataclass_instance = dataclass(instance)
@@ -229,13 +385,9 @@ class ManyWithProperties(Many[TModel], Generic[TModel, TProperties]):
             properties: TProperties,
             invert_operation=False):
         if self._source and not invert_operation:
-            asyncio.create_task(self._source._add_operation(
-                self._link(self._source, element, properties)
-            ))
+            self._link(self._source, element, properties)
             if self._bidirectionnal:
-                asyncio.create_task(self._source._add_operation(
-                    self._link(element, self._source, properties)
-                ))
+                self._link(element, self._source, properties)
                 getattr(element, self._attribute_name).add(self._source, properties,
                                                            invert_operation=True)
         self._elements.append(element)
@@ -244,11 +396,9 @@ class ManyWithProperties(Many[TModel], Generic[TModel, TProperties]):
     def remove(self, element: TModel,  # type: ignore[override]
                invert_operation=False):
         if self._source and not invert_operation:
-            asyncio.create_task(self._source._add_operation(self._unlink(self._source, element)))
+            self._unlink(self._source, element)
             if self._bidirectionnal:
-                asyncio.create_task(self._source._add_operation(
-                    self._unlink(element, self._source)
-                ))
+                self._unlink(element, self._source)
                 getattr(element, self._attribute_name).remove(self._source, invert_operation=True)
 
         with suppress(ValueError):
@@ -256,46 +406,38 @@ class ManyWithProperties(Many[TModel], Generic[TModel, TProperties]):
             del self._elements[index]
             del self._properties[index]
 
-    async def get(self) -> list[tuple[TModel, TProperties]]:  # type: ignore[override]
-        if not self._loaded:
-            ref = self.__orig_class__.__args__[0]  # type: ignore[attr-defined]
-            if isinstance(ref, ForwardRef):
-                ref = MetaModel._models[ref.__forward_arg__]
-            target_cls = ref
+    def _fill(self, rows: list[tuple], columns: tuple[str, ...]):
+        self._elements = self._decode_targets(rows, columns)
+        self._properties = self._decode_properties(rows, columns, self._get_properties_cls())
 
-            ref = self.__orig_class__.__args__[1]  # type: ignore[attr-defined]
-            if isinstance(ref, ForwardRef):
-                ref = MetaProperties._properties[ref.__forward_arg__]
-            properties_cls = ref
+    async def get(self, where: Condition | None = None,  # type: ignore[override]
+                  order_by: Sequence[Ordering | PropertyCondition] | None = None,
+                  limit: int | None = None) -> list[tuple[TModel, TProperties]]:
+        if where is not None or order_by is not None or limit is not None:
+            rows, columns = await self._fetch_targets(where, order_by, limit)
+            return list(zip(self._decode_targets(rows, columns),
+                            self._decode_properties(rows, columns, self._get_properties_cls())))
 
-            assert self._source
-            self._elements = []
-            self._properties = []
-            req = self._get_target_match_request(target_cls, properties_cls=properties_cls)
-            async with self._source._database_connection.cursor(row_factory=dict_row) as cursor:
-                await cursor.execute_cypher(*req)
-                async for row in cursor:
-                    parameters = {name[3:]: value for (name, value) in row.items()
-                                  if name.startswith('n2.') and value is not None
-                                  and value != '  cypher.null'}
-                    inst_cls = MetaModel._models[row['labels(n2)']]
-                    for property_name in inst_cls._properties_names:
-                        if property_name not in parameters.keys():
-                            parameters[property_name] = None
-                    instance = inst_cls(**parameters)
-                    instance._rid = row['id(n2)']
-                    properties_parameters = {name[2:]: value for (name, value) in row.items()
-                                             if name.startswith('r.') and value is not None
-                                             and value != '  cypher.null'}
-                    for property_name in properties_cls._properties_names:  # type: ignore
-                        if property_name not in properties_parameters.keys():
-                            properties_parameters[property_name] = None
-                    properties_instance = properties_cls(**properties_parameters)  # type: ignore
-                    self._elements.append(instance)
-                    self._properties.append(properties_instance)
+        if not self._loaded:
+            await self._load()
 
         return list(zip(self._elements, self._properties))
 
+    async def iter(self, batch_size: int = 1000,  # type: ignore[override]
+                   where: Condition | None = None) -> AsyncIterator[tuple[TModel, TProperties]]:
+        properties_cls = self._get_properties_cls()
+        async for rows, columns in self._iter_rows(batch_size, where):
+            for target in zip(self._decode_targets(rows, columns),
+                              self._decode_properties(rows, columns, properties_cls)):
+                yield target
+
+    async def page(self, offset: int, limit: int,  # type: ignore[override]
+                   where: Condition | None = None) -> list[tuple[TModel, TProperties]]:
+        rows, columns = await self._fetch_targets(where, None, limit, skip=offset,
+                                                  order_by_edge_rid=True)
+        return list(zip(self._decode_targets(rows, columns),
+                        self._decode_properties(rows, columns, self._get_properties_cls())))
+
 
 class OneWithProperties(One[TModel], Generic[TModel, TProperties]):
     def __init__(self, *args, **kwargs):
@@ -305,13 +447,9 @@ class OneWithProperties(One[TModel], Generic[TModel, TProperties]):
     def set(self, element: TModel, properties: TProperties,  # type: ignore[override]
             invert_operation=False):
         if self._source and not invert_operation:
-            asyncio.create_task(self._source._add_operation(
-                self._link(self._source, element, properties)
-            ))
+            self._link(self._source, element, properties)
             if self._bidirectionnal:
-                asyncio.create_task(self._source._add_operation(
-                    self._link(element, self._source, properties)
-                ))
+                self._link(element, self._source, properties)
                 getattr(element, self._attribute_name).set(self._source, properties,
                                                            invert_operation=True)
         self._element = element
@@ -319,54 +457,26 @@ class OneWithProperties(One[TModel], Generic[TModel, TProperties]):
 
     def unset(self, element: TModel, invert_operation=False):  # type: ignore[override]
         if self._source and not invert_operation:
-            asyncio.create_task(self._source._add_operation(self._unlink(self._source, element)))
+            self._unlink(self._source, element)
             if self._bidirectionnal:
-                asyncio.create_task(self._source._add_operation(
-                    self._unlink(element, self._source)
-                ))
+                self._unlink(element, self._source)
                 getattr(element, self._attribute_name).unset(self._source, invert_operation=True)
 
         self._element = None
         self._properties = None
 
-    async def get(self) -> tuple[TModel | None, TProperties | None]:  # type: ignore[override]
-        if not self._loaded:
-            ref = self.__orig_class__.__args__[0]  # type: ignore[attr-defined]
-            if isinstance(ref, ForwardRef):
-                ref = MetaModel._models[ref.__forward_arg__]
-            target_cls = ref
-
-            ref = self.__orig_class__.__args__[1]  # type: ignore[attr-defined]
-            if isinstance(ref, ForwardRef):
-                ref = MetaProperties._properties[ref.__forward_arg__]
-            properties_cls = ref
-
-            assert self._source
+    def _fill(self, rows: list[tuple], columns: tuple[str, ...]):
+        if rows:
+            self._element = self._decode_targets(rows[:1], columns)[0]
+            self._properties = self._decode_properties(rows[:1], columns,
+                                                       self._get_properties_cls())[0]
+        else:
             self._element = None
             self._properties = None
-            req = self._get_target_match_request(target_cls, properties_cls=properties_cls)
-            async with self._source._database_connection.cursor(row_factory=dict_row) as cursor:
-                await cursor.execute_cypher(*req)
-                row = await cursor.fetchone()
-                if row:
-                    parameters = {name[3:]: value for (name, value) in row.items()
-                                  if name.startswith('n2.') and value is not None
-                                  and value != '  cypher.null'}
-                    inst_cls = MetaModel._models[row['labels(n2)']]
-                    for property_name in inst_cls._properties_names:
-                        if property_name not in parameters.keys():
-                            parameters[property_name] = None
-                    instance = inst_cls(**parameters)
-                    instance._rid = row['id(n2)']
-                    properties_parameters = {name[2:]: value for (name, value) in row.items()
-                                             if name.startswith('r.') and value is not None
-                                             and value != '  cypher.null'}
-                    for property_name in properties_cls._properties_names:  # type: ignore
-                        if property_name not in properties_parameters.keys():
-                            properties_parameters[property_name] = None
-                    properties_instance = properties_cls(**properties_parameters)  # type: ignore
-                    self._element = instance
-                    self._properties = properties_instance
+
+    async def get(self) -> tuple[TModel | None, TProperties | None]:  # type: ignore[override]
+        if not self._loaded:
+            await self._load()
 
         return self._element, self._properties
 
@@ -1,9 +1,7 @@
-from dataclasses import fields
 from datetime import datetime
 from types import NoneType, UnionType
-from typing import Any, Callable, Tuple, TypeVar, Union, get_args, get_origin
-
-import akiradb
+from typing import (Any, Callable, Iterable, Iterator, Sequence, Tuple, TypeVar, Union, get_args,
+                    get_origin)
 
 _T = TypeVar('_T')
 
@@ -36,10 +34,14 @@ def _get_cypher_property_type(field_type):
         return 'string'
 
 
-def _parse_cypher_properties(properties: dict[str, Any],
-                             model_cls: 'akiradb.model.base_model.MetaModel'):
-    for model_field in fields(model_cls):
-        if model_field.name in model_cls._properties_names and model_field.name not in properties:
-            properties[model_field.name] = None
+def _group_by_class(nodes: Iterable[_T]) -> dict[type[_T], list[_T]]:
+    groups: dict[type[_T], list[_T]] = {}
+    for node in nodes:
+        groups.setdefault(type(node), []).append(node)
+
+    return groups
+
 
-    return model_cls(**properties)
+def _chunks(items: Sequence[_T], size: int) -> Iterator[Sequence[_T]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
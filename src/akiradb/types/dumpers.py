@@ -1,6 +1,9 @@
 from decimal import Decimal
 from datetime import datetime
+from math import copysign, isfinite
 import re
+from typing import Any
+from psycopg import abc, postgres
 from psycopg.adapt import Dumper, PyFormat, RecursiveDumper
 from psycopg.pq import Format
 from psycopg.adapt import AdaptersMap
@@ -10,6 +13,37 @@ from akiradb.types.query import Label
 
 forbidden_chars = re.compile('[^a-zA-Z0-9_.]')
 
+# Sanitised names are the same few property and label names over and over
+_SANITISED_CACHE_SIZE = 4096
+_sanitised: dict[str, bytes] = {}
+
+
+def _sanitise(name: str) -> bytes:
+    sanitised = _sanitised.get(name)
+    if sanitised is None:
+        if len(_sanitised) >= _SANITISED_CACHE_SIZE:
+            _sanitised.clear()
+        sanitised = _sanitised[name] = forbidden_chars.sub('_', name).encode('utf-8')
+    return sanitised
+
+
+# Powers of 5 turning the binary fraction of a float into a decimal one
+_powers_of_five = [5 ** k for k in range(1075)]
+
+
+def _format_float(obj: float) -> str:
+    # Same output as format(Decimal(obj), 'f'): the exact decimal value of the float
+    if not isfinite(obj):
+        return format(Decimal(obj), 'f')
+    numerator, denominator = obj.as_integer_ratio()
+    sign = '-' if copysign(1.0, obj) < 0 else ''
+    if denominator == 1:
+        return sign + str(abs(numerator))
+    # The denominator is 2 ** k, so the value is numerator * 5 ** k / 10 ** k
+    k = denominator.bit_length() - 1
+    digits = str(abs(numerator) * _powers_of_five[k]).rjust(k + 1, '0')
+    return sign + digits[:-k] + '.' + digits[-k:]
+
 
 class StringDumper(Dumper):
     format = Format.TEXT
@@ -17,6 +51,13 @@ class StringDumper(Dumper):
     def dump(self, obj: str) -> bytes:
         return obj.encode('utf-8')
 
+    def quote(self, obj: str) -> bytes:
+        # Same output as the libpq literal escaping, without a call through it for each value
+        escaped = obj.replace("'", "''")
+        if '\\' in escaped:
+            return (" E'" + escaped.replace('\\', '\\\\') + "'").encode('utf-8')
+        return ("'" + escaped + "'").encode('utf-8')
+
 
 class LabelDumper(Dumper):
     format = Format.TEXT
@@ -25,11 +66,13 @@ class LabelDumper(Dumper):
         return obj.label_name.encode('utf-8')
 
     def quote(self, obj: Label) -> bytes:
-        return forbidden_chars.sub('_', obj.label_name).encode('utf-8')
+        return _sanitise(obj.label_name)
 
 
+# Oids type the values bound server-side, interpolated values only use quote()
 class IntDumper(Dumper):
     format = Format.TEXT
+    oid = postgres.types['int8'].oid
 
     def dump(self, obj: int) -> bytes:
         return repr(obj).encode('utf-8')
@@ -40,6 +83,7 @@ class IntDumper(Dumper):
 
 class BoolDumper(Dumper):
     format = Format.TEXT
+    oid = postgres.types['bool'].oid
 
     def dump(self, obj: bool) -> bytes:
         return ("true" if obj else "false").encode('utf-8')
@@ -50,40 +94,64 @@ class BoolDumper(Dumper):
 
 class FloatDumper(Dumper):
     format = Format.TEXT
+    oid = postgres.types['float8'].oid
 
     def dump(self, obj: float) -> bytes:
-        return format(Decimal(obj), 'f').encode('utf-8')
+        return _format_float(obj).encode('utf-8')
 
     def quote(self, obj: float) -> bytes:
         return self.dump(obj)
 
 
+# Datetimes are stored as milliseconds since the epoch
 class DatetimeDumper(Dumper):
     format = Format.TEXT
+    oid = postgres.types['int8'].oid
 
     def dump(self, obj: datetime) -> bytes:
         return repr(int(obj.timestamp()*1000)).encode('utf-8')
 
 
-class DictDumper(RecursiveDumper):
+class CollectionDumper(RecursiveDumper):
     format = Format.TEXT
 
+    def __init__(self, cls: type, context: abc.AdaptContext | None = None):
+        super().__init__(cls, context)
+        self._format = PyFormat.from_pq(self.format)
+        # Type of value -> its dumper, for the values of this query
+        self._dumpers: dict[type, abc.Dumper] = {}
+
+    def _quote_value(self, value: Any) -> abc.Buffer:
+        dumper = self._dumpers.get(type(value))
+        if dumper is None:
+            dumper = self._dumpers[type(value)] = self._tx.get_dumper(value, self._format)
+        return dumper.quote(value)
+
+
+class DictDumper(CollectionDumper):
     def dump(self, _: dict) -> bytes:
         raise NotImplementedError()
 
     def quote(self, obj: dict) -> bytes:
         from akiradb.model.proxies import PropertyChangesRecorder
 
-        format = PyFormat.from_pq(self.format)
-        get_value = lambda val: val.value if isinstance(val, PropertyChangesRecorder) else val
-
-        res = (forbidden_chars.sub('_', key).encode('utf-8') + b':'
-               + self._tx.get_dumper((val := get_value(value)), format).quote(val)
+        quote_value = self._quote_value
+        res = (_sanitise(key) + b':'
+               + quote_value(value.value if type(value) is PropertyChangesRecorder else value)
                for key, value in obj.items())
 
         return b'{' + b','.join(res) + b'}'
 
 
+class ListDumper(CollectionDumper):
+    def dump(self, _: list) -> bytes:
+        raise NotImplementedError()
+
+    def quote(self, obj: list) -> bytes:
+        quote_value = self._quote_value
+        return b'[' + b','.join([quote_value(value) for value in obj]) + b']'
+
+
 def register_dumpers(adapters: AdaptersMap):
     adapters.register_dumper(str, StringDumper)
     adapters.register_dumper(Label, LabelDumper)
@@ -91,4 +159,5 @@ def register_dumpers(adapters: AdaptersMap):
     adapters.register_dumper(bool, BoolDumper)
     adapters.register_dumper(float, FloatDumper)
     adapters.register_dumper(dict, DictDumper)
+    adapters.register_dumper(list, ListDumper)
     adapters.register_dumper(datetime, DatetimeDumper)